@@ -4,25 +4,33 @@ Duplicate Analysis Script for Social Impact Initiatives
 Compares original 1250+ list with current 1091 catalog
 """
 
+import argparse
+import json
 import re
-from difflib import SequenceMatcher
-from collections import defaultdict
+import sys
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+
+import instrumentation
+import neighbour_index
+from instrumentation import STATS
+from neighbour_index import NEIGHBOURS_K, NeighbourIndex
+from scoring import SequenceScorer, above
+from text_features import FeatureStore, NormalizationProfile
+
+PROFILE = NormalizationProfile(
+    r'^(to |platform to |app to |initiative to )',
+    r'(platform|app|initiative)$'
+)
+FEATURES = FeatureStore(PROFILE)
 
 def normalize_text(text):
     """Normalize text for comparison"""
-    # Convert to lowercase
-    text = text.lower()
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    # Remove common prefixes/suffixes
-    text = re.sub(r'^(to |platform to |app to |initiative to )', '', text)
-    text = re.sub(r'(platform|app|initiative)$', '', text)
-    text = text.strip()
-    return text
+    return FEATURES.get(text).normalized
 
 def similarity_score(a, b):
     """Calculate similarity between two strings"""
-    return SequenceMatcher(None, normalize_text(a), normalize_text(b)).ratio()
+    return FEATURES.scorer(b).ratio(FEATURES.get(a).normalized)
 
 def parse_original_list():
     """Parse the original user list into individual initiatives"""
@@ -113,17 +121,18 @@ Create a fertilizers bank for disadvantaged farmers
  Support manual handloom weavers with raw materials, tools, and market access, sponsors leaderboard."""
     
     # Split into individual lines and clean
-    initiatives = []
-    for line in original_text.strip().split('\n'):
+    return list(iter_original_lines(original_text.strip().split('\n')))
+
+def iter_original_lines(lines):
+    """Yield the cleaned initiatives of an original list, one line at a time"""
+    for line in lines:
         line = line.strip()
         if line and not line.startswith('#'):
             # Remove leading numbers, dots, dashes
             line = re.sub(r'^\d+[\.\)\-\s]*', '', line)
             # Remove leading bullet points
             line = re.sub(r'^[\-\*\•]\s*', '', line)
-            initiatives.append(line.strip())
-    
-    return initiatives
+            yield line.strip()
 
 def read_current_initiatives():
     """Read current initiatives from the generated file"""
@@ -134,8 +143,93 @@ def read_current_initiatives():
         print("Current initiatives file not found")
         return []
 
-def find_duplicates():
-    """Find duplicates between original and current lists"""
+class CatalogIndex:
+    """Current initiatives ordered by normalized length, for best-match lookups.
+
+    A ratio of at least t needs the shorter text to be at least t / (2 - t)
+    times the longer one, so a lookup only scores entries inside that length
+    window. Pruning is lossless, and ties still go to the earliest entry.
+    With a NeighbourIndex of current, a lookup only scores the NEIGHBOURS_K
+    nearest entries instead, and misses a best match outside them.
+    """
+    
+    def __init__(self, current, neighbours=None):
+        self.current = current
+        self.neighbours = neighbours
+        normalized = [FEATURES.get(text).normalized for text in current]
+        self.order = sorted(range(len(current)), key=lambda j: len(normalized[j]))
+        self.lengths = [len(normalized[j]) for j in self.order]
+        self.scorers = [SequenceScorer(text) for text in normalized]
+    
+    def best_match(self, text, threshold, normalized=None):
+        """(j, current text, score) of the best entry scoring at least threshold, or None"""
+        if normalized is None:
+            normalized = FEATURES.get(text).normalized
+        length = len(normalized)
+        if self.neighbours is not None:
+            window = [j for j, _, _ in self.neighbours.query(text, NEIGHBOURS_K)]
+            STATS.add('pairs_considered', len(self.lengths))
+            STATS.add('neighbour_pairs', len(window))
+        else:
+            if threshold > 0:
+                low = bisect_left(self.lengths, length * threshold / (2 - threshold) - 1e-9)
+                high = bisect_right(self.lengths, length * (2 - threshold) / threshold + 1e-9)
+            else:
+                low, high = 0, len(self.lengths)
+            window = self.order[low:high]
+            STATS.add('pairs_considered', high - low)
+            STATS.add('pairs_pruned_by_length', len(self.lengths) - (high - low))
+        
+        best_match = None
+        best_score = 0
+        counts = Counter(normalized)
+        for j in sorted(window):
+            # Only a score above both the threshold and the best so far can change the result
+            score = self.scorers[j].bounded_ratio(normalized, max(threshold, above(best_score)), counts)
+            if score is not None and score > best_score:
+                best_score = score
+                best_match = (j, self.current[j], score)
+        
+        if best_match and best_match[2] >= threshold:
+            return best_match
+        return None
+
+def catalog_index(current, neighbours=None):
+    """CatalogIndex of current, querying the neighbour index in the neighbours directory if given"""
+    if neighbours is None:
+        return CatalogIndex(current)
+    # Reused while the catalog is unchanged, rebuilt and saved otherwise
+    return CatalogIndex(current, NeighbourIndex.for_catalog(current, neighbours, PROFILE))
+
+def stream_duplicates(lines, output, threshold=0.8, neighbours=None):
+    """Match an original list line by line and write one JSON object per line.
+
+    Originals are normalized without caching, so memory stays bounded by the
+    catalog index however long the list is.
+    """
+    index = catalog_index(read_current_initiatives(), neighbours)
+    counts = Counter()
+    
+    for line_number, orig in enumerate(iter_original_lines(lines), 1):
+        match = index.best_match(orig, threshold, PROFILE.normalize(orig))
+        result = {'line': line_number, 'original': orig, 'match': None}
+        if match:
+            curr_idx, curr_text, score = match
+            result.update(
+                match='exact' if score >= 0.95 else 'near',
+                index=curr_idx, current=curr_text, similarity=round(score, 4)
+            )
+        counts[result['match']] += 1
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+    
+    output.flush()
+    print(f"Streamed {sum(counts.values())} lines: {counts['exact']} exact, {counts['near']} near, "
+          f"{counts[None]} unmatched", file=sys.stderr)
+    return counts
+
+def find_duplicates(neighbours=None):
+    """Find duplicates between original and current lists; neighbours is the directory of a neighbour index to query"""
+    STATS.lap('read lists')
     original = parse_original_list()
     current = read_current_initiatives()
     
@@ -148,22 +242,19 @@ def find_duplicates():
     near_matches = []
     threshold = 0.8  # 80% similarity
     
+    STATS.lap('catalog index')
+    index = catalog_index(current, neighbours)
+    STATS.lap('matching')
     for i, orig in enumerate(original):
-        best_match = None
-        best_score = 0
-        
-        for j, curr in enumerate(current):
-            score = similarity_score(orig, curr)
-            if score > best_score:
-                best_score = score
-                best_match = (j, curr, score)
+        best_match = index.best_match(orig, threshold)
         
-        if best_match and best_match[2] >= threshold:
+        if best_match:
             if best_match[2] >= 0.95:  # Exact match
                 exact_matches.append((i, orig, best_match))
             else:  # Near match
                 near_matches.append((i, orig, best_match))
     
+    STATS.lap('report')
     print("=== EXACT MATCHES (95%+ similarity) ===")
     for i, (orig_idx, orig_text, (curr_idx, curr_text, score)) in enumerate(exact_matches, 1):
         print(f"{i}. ORIGINAL: {orig_text}")
@@ -188,4 +279,19 @@ def find_duplicates():
     return exact_matches, near_matches
 
 if __name__ == "__main__":
-    find_duplicates()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Compare an original list with the current catalog")
+    parser.add_argument('--stream', metavar='FILE',
+                        help="match FILE ('-' for stdin) line by line and print JSON lines instead of the report")
+    parser.add_argument('--threshold', type=float, default=0.8, help="minimum similarity for a match (stream mode)")
+    neighbour_index.add_argument(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+    
+    if args.stream is None:
+        STATS.run('analyze_duplicates', find_duplicates, args.neighbours)
+    elif args.stream == '-':
+        STATS.run('analyze_duplicates --stream', stream_duplicates, sys.stdin, sys.stdout, args.threshold, args.neighbours)
+    else:
+        with open(args.stream, 'r', encoding='utf-8') as f:
+            STATS.run('analyze_duplicates --stream', stream_duplicates, f, sys.stdout, args.threshold, args.neighbours)
\ No newline at end of file
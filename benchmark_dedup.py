@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Deduplication Benchmark Harness
+Runs every duplicate scanner on synthetic catalogs with planted duplicates and reports time, memory and accuracy as JSON
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from multiprocessing import get_context
+
+from initiatives_parser import decode_value, load_initiatives
+from instrumentation import STATS
+
+SAMPLE_PATH = '/workspace/initiatives-data.js'
+REPORT_PATH = '/workspace/benchmark_report.json'
+DEFAULT_SIZES = (1000, 5000, 20000, 100000)
+
+# Share of catalog entries that get a planted copy, and how the copies are distributed
+DUPLICATE_RATE = 0.1
+MUTATIONS = ('exact', 'light', 'medium')
+
+TITLE_SUFFIXES = ('Hub', 'Program', 'Network', 'Initiative', 'Platform', 'Support')
+
+# (benchmark, scorer) -> largest catalog run by default; past this the run takes many minutes
+SIZE_LIMITS = {
+    ('internal_duplicate_scanner', 'sequence'): 20000,
+    ('internal_duplicate_scanner', 'tfidf'): 20000,
+    ('careful_duplicate_removal', 'sequence'): 5000,
+    ('comprehensive_duplicate_scan', 'sequence'): 1000,
+    ('analyze_duplicates', 'sequence'): 5000,
+    ('comprehensive_analysis', 'sequence'): 1000,
+    ('comprehensive_analysis', 'tfidf'): 20000,
+}
+
+# A run is a regression when it is this much slower, or loses this much accuracy, than the baseline
+TIME_TOLERANCE = 1.25
+ACCURACY_TOLERANCE = 0.01
+
+
+def load_sample(path=SAMPLE_PATH):
+    """Real initiatives the synthetic catalogs are built from"""
+    parsed = load_initiatives(path, 'initiativesData')
+    if parsed is None:
+        raise ValueError(f"No initiativesData array in {path}")
+    return [{field: decode_value(value) for field, value in record.to_dict().items()} for record in parsed]
+
+
+class CatalogGenerator:
+    """Synthetic initiatives recombined from the words and sentences of real ones"""
+
+    def __init__(self, sample, seed):
+        self.random = random.Random(seed)
+        titles = [record['title'].split() for record in sample]
+        self.first_words = sorted({words[0] for words in titles})
+        self.middle_words = sorted({word for words in titles for word in words[1:-1]})
+        self.last_words = sorted({words[-1] for words in titles if len(words) > 1})
+        self.sentences = sorted({
+            sentence.strip() for record in sample
+            for sentence in re.split(r'(?<=\.)\s+', record['description']) if sentence.strip()
+        })
+        self.categories = sorted({record['category'] for record in sample})
+        self.icons = sorted({record['icon'] for record in sample})
+
+    def initiative(self, seen):
+        """One new initiative whose title is not in seen"""
+        while True:
+            middle = self.random.sample(self.middle_words, self.random.randint(1, 2))
+            title = ' '.join([self.random.choice(self.first_words), *middle, self.random.choice(self.last_words)])
+            if title not in seen:
+                seen.add(title)
+                break
+        return {
+            'title': title,
+            'description': ' '.join(self.random.sample(self.sentences, self.random.randint(2, 3))),
+            'category': self.random.choice(self.categories),
+            'impact': 'Synthetic impact',
+            'beneficiaries': f'{self.random.randint(1, 500)}K+ people',
+            'icon': self.random.choice(self.icons),
+        }
+
+    def variant(self, record, mutation):
+        """A planted duplicate of record: identical, lightly edited or reworded"""
+        copy = dict(record)
+        words = record['title'].split()
+        if mutation == 'light':
+            copy['title'] = f"{record['title']} {self.random.choice(TITLE_SUFFIXES)}"
+            copy['description'] = record['description'] + ' Expanded to more districts.'
+        elif mutation == 'medium':
+            words[self.random.randrange(len(words))] = self.random.choice(self.middle_words)
+            copy['title'] = ' '.join(words)
+            sentences = re.split(r'(?<=\.)\s+', record['description'])
+            self.random.shuffle(sentences)
+            copy['description'] = ' '.join(sentences)
+        return copy
+
+    def catalog(self, size):
+        """size initiatives, about DUPLICATE_RATE of them planted copies of others.
+
+        Returns the records and the planted (original, copy, mutation, title ratio) tuples.
+        """
+        planted_count = int(size * DUPLICATE_RATE)
+        seen = set()
+        records = [self.initiative(seen) for _ in range(size - planted_count)]
+        for source in self.random.sample(range(len(records)), planted_count):
+            mutation = self.random.choice(MUTATIONS)
+            records.append((source, self.variant(records[source], mutation), mutation))
+
+        # Shuffle copies in among the originals and remember where everything landed
+        order = list(range(len(records)))
+        self.random.shuffle(order)
+        position = {old: new for new, old in enumerate(order)}
+        catalog = [None] * len(records)
+        planted = []
+        for old, new in position.items():
+            entry = records[old]
+            if isinstance(entry, tuple):
+                source, entry, mutation = entry
+                original = records[source]
+                similarity = SequenceMatcher(None, original['title'].lower(), entry['title'].lower()).ratio()
+                planted.append((position[source], new, mutation, round(similarity, 3)))
+            catalog[new] = entry
+        return catalog, sorted(planted)
+
+    def originals(self, catalog, count):
+        """An external list for cross-list matching: variants of catalog entries plus unrelated ones.
+
+        Returns the titles and {original index: catalog index} for the planted matches.
+        """
+        seen = {record['title'] for record in catalog}
+        texts = []
+        truth = {}
+        for k, j in enumerate(self.random.sample(range(len(catalog)), count // 2)):
+            texts.append(self.variant(catalog[j], self.random.choice(MUTATIONS))['title'])
+            truth[k] = j
+        texts.extend(self.initiative(seen)['title'] for _ in range(count - len(texts)))
+        return texts, truth
+
+
+def pair_accuracy(predicted, truth):
+    """Precision and recall of predicted (i, j) pairs against the planted ones"""
+    predicted = {tuple(sorted(pair)) for pair in predicted}
+    truth = {tuple(sorted(pair)) for pair in truth}
+    hits = len(predicted & truth)
+    return {
+        'predicted': len(predicted),
+        'precision': round(hits / len(predicted), 4) if predicted else 1.0,
+        'recall': round(hits / len(truth), 4) if truth else 1.0,
+    }
+
+
+def cluster_pairs_of(groups):
+    """Every pair of indices that share a group"""
+    return [(a, b) for group in groups for n, a in enumerate(group) for b in group[n + 1:]]
+
+
+def _planted_groups(planted):
+    """Planted duplicates as groups: an original with all of its copies"""
+    groups = {}
+    for original, copy, _, _ in planted:
+        groups.setdefault(original, [original]).append(copy)
+    return list(groups.values())
+
+
+def _run_internal(catalog, planted, scorer):
+    import internal_duplicate_scanner as scanner
+
+    # The scanner reads its catalog from a file, one initiative per line
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as f:
+        f.writelines(f"{record['title']}\n" for record in catalog)
+    try:
+        _, groups, _ = scanner.find_internal_duplicates(scorer=scorer, path=f.name)
+    finally:
+        os.remove(f.name)
+    clusters = [[idx for idx, _ in group] for group in groups]
+    return pair_accuracy(cluster_pairs_of(clusters), cluster_pairs_of(_planted_groups(planted)))
+
+
+def _run_careful(catalog, planted, scorer):
+    import careful_duplicate_removal as careful
+
+    removed = set(careful.find_duplicates_carefully([dict(record) for record in catalog]))
+    # A planted group is caught when all but one of its members are removed
+    groups = _planted_groups(planted)
+    planted_members = {member for group in groups for member in group}
+    caught = sum(1 for group in groups if len(set(group) - removed) == 1)
+    return {
+        'predicted': len(removed),
+        'precision': round(len(removed & planted_members) / len(removed), 4) if removed else 1.0,
+        'recall': round(caught / len(groups), 4) if groups else 1.0,
+    }
+
+
+def _run_comprehensive_scan(catalog, planted, scorer):
+    import comprehensive_duplicate_scan as scan
+
+    initiatives = [{'index': i, 'title': record['title'], 'description': record['description']}
+                   for i, record in enumerate(catalog)]
+    pairs = [(a['index'], b['index']) for a, b, _ in scan.find_highly_similar(initiatives, 0.9)]
+    for group in scan.find_exact_duplicates(initiatives).values():
+        pairs.extend(cluster_pairs_of([[init['index'] for init in group]]))
+    return pair_accuracy(pairs, cluster_pairs_of(_planted_groups(planted)))
+
+
+def _cross_accuracy(matches, truth):
+    """Precision and recall of original -> catalog matches against the planted ones"""
+    hits = sum(1 for k, j in matches.items() if truth.get(k) == j)
+    return {
+        'predicted': len(matches),
+        'precision': round(hits / len(matches), 4) if matches else 1.0,
+        'recall': round(hits / len(truth), 4) if truth else 1.0,
+    }
+
+
+def _run_analyze(catalog, originals, truth, scorer):
+    import analyze_duplicates as analyze
+
+    index = analyze.CatalogIndex([record['title'] for record in catalog])
+    matches = {}
+    for k, text in enumerate(originals):
+        match = index.best_match(text, 0.8, analyze.PROFILE.normalize(text))
+        if match:
+            matches[k] = match[0]
+    return _cross_accuracy(matches, truth)
+
+
+def _run_comprehensive_analysis(catalog, originals, truth, scorer):
+    import comprehensive_analysis as analysis
+
+    results = analysis.score_originals(originals, [record['title'] for record in catalog], scorer=scorer)
+    matches = {k: match[0] for k, match in enumerate(results) if match}
+    return _cross_accuracy(matches, truth)
+
+
+BENCHMARKS = {
+    'internal_duplicate_scanner': (_run_internal, ('sequence', 'tfidf'), False),
+    'careful_duplicate_removal': (_run_careful, ('sequence',), False),
+    'comprehensive_duplicate_scan': (_run_comprehensive_scan, ('sequence',), False),
+    'analyze_duplicates': (_run_analyze, ('sequence',), True),
+    'comprehensive_analysis': (_run_comprehensive_analysis, ('sequence', 'tfidf'), True),
+}
+
+
+def run_benchmark(name, scorer, size, seed, sample_path):
+    """One benchmark in the current process; meant to run in a fresh child so peak RSS is its own"""
+    runner, _, cross_list = BENCHMARKS[name]
+    generator = CatalogGenerator(load_sample(sample_path), seed)
+    catalog, planted = generator.catalog(size)
+    if cross_list:
+        originals, truth = generator.originals(catalog, max(10, size // 10))
+        args = (catalog, originals, truth, scorer)
+    else:
+        args = (catalog, planted, scorer)
+
+    # The scanners' own counters: candidate pairs each one considered, pairs
+    # the length/character bounds pruned, and pairs scored in full, either by
+    # SequenceMatcher.ratio() or as a TF-IDF neighbour whose cosine was read
+    STATS.configure(stats=True)
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        try:
+            accuracy = runner(*args)
+        finally:
+            STATS.remove_hooks()
+        elapsed = time.perf_counter() - start
+
+    counters = STATS.summary()['counters']
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return {
+        'benchmark': name,
+        'scorer': scorer,
+        'size': size,
+        'wall_time_s': round(elapsed, 3),
+        'peak_rss_mb': round(peak_mb, 1),
+        'pairs_considered': counters.get('pairs_considered', 0),
+        'pairs_pruned': counters.get('pairs_pruned', 0),
+        'ratio_calls': counters.get('ratio_calls', 0),
+        'cosine_pairs': counters.get('cosine_pairs', 0),
+        'pairs_scored': counters.get('ratio_calls', 0) + counters.get('cosine_pairs', 0),
+        'planted': len(truth) if cross_list else len(planted),
+        **accuracy,
+    }
+
+
+def compare_with_baseline(results, baseline_path):
+    """Regressions of this run against an earlier report, as printable strings"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {
+            (entry['benchmark'], entry['scorer'], entry['size']): entry
+            for entry in json.load(f)['results'] if 'skipped' not in entry
+        }
+
+    regressions = []
+    for entry in results:
+        before = baseline.get((entry['benchmark'], entry['scorer'], entry['size']))
+        if before is None or 'skipped' in entry:
+            continue
+        label = f"{entry['benchmark']}[{entry['scorer']}] @ {entry['size']}"
+        if entry['wall_time_s'] > before['wall_time_s'] * TIME_TOLERANCE:
+            regressions.append(f"{label}: {before['wall_time_s']}s → {entry['wall_time_s']}s")
+        for metric in ('precision', 'recall'):
+            if entry[metric] < before[metric] - ACCURACY_TOLERANCE:
+                regressions.append(f"{label}: {metric} {before[metric]} → {entry[metric]}")
+    return regressions
+
+
+def run_suite(sizes=DEFAULT_SIZES, benchmarks=None, seed=42, sample_path=SAMPLE_PATH, no_limits=False):
+    """Every selected benchmark and scorer at every size, each in its own process"""
+    results = []
+    context = get_context('spawn')
+    for name, (_, scorers, _) in BENCHMARKS.items():
+        if benchmarks and name not in benchmarks:
+            continue
+        for scorer in scorers:
+            for size in sizes:
+                limit = SIZE_LIMITS.get((name, scorer))
+                if limit is not None and size > limit and not no_limits:
+                    results.append({'benchmark': name, 'scorer': scorer, 'size': size,
+                                    'skipped': f"above the default limit of {limit} (use --no-limits)"})
+                    print(f"⏭️  {name} [{scorer}] @ {size}: skipped (limit {limit})")
+                    continue
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(run_benchmark, name, scorer, size, seed, sample_path).result()
+                results.append(result)
+                print(f"⏱️  {name} [{scorer}] @ {size}: {result['wall_time_s']}s, {result['peak_rss_mb']} MB, "
+                      f"{result['pairs_considered']:,} pairs considered, {result['pairs_pruned']:,} pruned by bounds, "
+                      f"{result['pairs_scored']:,} scored, precision {result['precision']:.1%}, "
+                      f"recall {result['recall']:.1%}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the duplicate scanners on synthetic catalogs")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="catalog sizes to generate")
+    parser.add_argument('--benchmark', action='append', choices=sorted(BENCHMARKS),
+                        help="run only this benchmark (repeatable)")
+    parser.add_argument('--seed', type=int, default=42, help="seed for the synthetic catalogs")
+    parser.add_argument('--sample', default=SAMPLE_PATH, help="initiatives file the catalogs imitate")
+    parser.add_argument('--no-limits', action='store_true', help="also run quadratic scanners on large catalogs")
+    parser.add_argument('--output', default=REPORT_PATH, help="where the JSON report is written")
+    parser.add_argument('--baseline', help="earlier report; exit non-zero if this run regressed against it")
+    args = parser.parse_args()
+
+    print("📏 DEDUPLICATION BENCHMARKS")
+    print("=" * 50)
+    results = run_suite(args.sizes, args.benchmark, args.seed, args.sample, args.no_limits)
+
+    report = {
+        'generated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'seed': args.seed,
+        'duplicate_rate': DUPLICATE_RATE,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline)
+        if regressions:
+            print("\n🔴 REGRESSIONS:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
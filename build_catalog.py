@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Catalog Build Step
+Compiles the inline initiatives array into a minified JSON file and a page that lazy-loads it
+"""
+
+import argparse
+import json
+import os
+
+from html_patcher import TextPatch, write_atomically
+from initiatives_parser import FIELDS, decode_value, parse_initiatives
+
+# Fields with few distinct values, stored once and referenced by position
+INTERNED_FIELDS = ('category', 'icon')
+
+# Initiatives kept inline in the page: enough to fill the first screen (four
+# columns, with the grid's buffer rows) before initiatives.json arrives
+INLINE_COUNT = 24
+
+def catalog_payload(records, intern=False):
+    """JSON-ready catalog: a plain list of objects, or rows with interned fields"""
+    items = [{field: decode_value(getattr(record, field)) for field in FIELDS} for record in records]
+    if not intern:
+        return items
+
+    interned = {field: sorted({item[field] for item in items}) for field in INTERNED_FIELDS}
+    positions = {field: {value: i for i, value in enumerate(values)} for field, values in interned.items()}
+    rows = [
+        [positions[field][item[field]] if field in positions else item[field] for field in FIELDS]
+        for item in items
+    ]
+    return {'fields': list(FIELDS), 'interned': interned, 'rows': rows}
+
+def build_catalog(source='/workspace/index.html', out_dir='/workspace/dist', intern=False, inline=INLINE_COUNT):
+    """Write initiatives.json and an index.html that embeds only the first initiatives and fetches the rest"""
+    print("📦 BUILDING CATALOG")
+    print("=" * 40)
+
+    with open(source, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    try:
+        parsed = parse_initiatives(content)
+    except ValueError as error:
+        print(f"❌ Could not parse initiatives array: {error}")
+        return None
+    if parsed is None:
+        print("❌ Could not find initiatives array")
+        return None
+
+    inline = min(max(inline, 0), len(parsed))
+    os.makedirs(out_dir, exist_ok=True)
+    catalog = json.dumps(catalog_payload(parsed.records[inline:], intern), ensure_ascii=False, separators=(',', ':'))
+    write_atomically(os.path.join(out_dir, 'initiatives.json'), catalog)
+
+    # Same page with only the first initiatives, copied as written; the loader
+    # script renders them at once and appends the JSON when it arrives
+    head = content[parsed.open_bracket + 1:parsed[inline - 1].end] + '\n' if inline else ''
+    patch = TextPatch(content)
+    patch.replace(parsed.start, parsed.end, f'const initiatives = [{head}];')
+    body = content.find('<body>')
+    if body != -1:
+        patch.replace(body, body + len('<body>'), '<body data-catalog="initiatives.json">')
+    head_end = content.find('</head>')
+    if head_end != -1:
+        patch.insert(head_end, '    <link rel="preload" href="initiatives.json" as="fetch" crossorigin>\n')
+    page = patch.apply()
+    write_atomically(os.path.join(out_dir, 'index.html'), page)
+
+    print(f"✅ {len(parsed)} initiatives: {inline} inline, {len(parsed) - inline} → initiatives.json "
+          f"({len(catalog.encode('utf-8')) // 1024} KB{', interned' if intern else ''})")
+    print(f"📄 Page: {len(content.encode('utf-8')) // 1024} KB → {len(page.encode('utf-8')) // 1024} KB")
+    return len(parsed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the lazy-loaded catalog")
+    parser.add_argument('--source', default='/workspace/index.html', help="page with the inline initiatives array")
+    parser.add_argument('--out-dir', default='/workspace/dist', help="where initiatives.json and index.html are written")
+    parser.add_argument('--intern', action='store_true', help="store category/icon once and reference them by index")
+    parser.add_argument('--inline', type=int, default=INLINE_COUNT, help="initiatives embedded in the page for the first screen")
+    args = parser.parse_args()
+
+    build_catalog(args.source, args.out_dir, args.intern, args.inline)
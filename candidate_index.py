@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Candidate Index for Duplicate Scanning
+Proposes only plausible duplicate pairs so the exact SequenceMatcher / keyword
+scoring runs on a small fraction of the catalog instead of every pair
+"""
+
+import math
+from collections import Counter, defaultdict
+
+# Guards the integer bounds below against float rounding
+EPSILON = 1e-9
+
+# Default n-gram posting cap: MIN_POSTINGS up to POSTINGS_REFERENCE records,
+# then growing with the fourth root of the catalog size, so a growing catalog
+# does not cut ever more n-grams from the index
+MIN_POSTINGS = 100
+POSTINGS_REFERENCE = 1000
+
+
+def char_grams(text, size=4):
+    """Character n-grams of normalized text, padded so short words still produce grams"""
+    padded = f" {text} "
+    return {padded[k:k + size] for k in range(len(padded) - size + 1)}
+
+
+def _postings_pairs(postings, pairs, only=None):
+    """Add every pair of records that share a posting list (and involve only, if given)"""
+    for ids in postings.values():
+        if only is None:
+            for a, i in enumerate(ids):
+                for j in ids[a + 1:]:
+                    pairs.add((i, j))
+            continue
+        for i in ids:
+            if i in only:
+                for j in ids:
+                    if j != i:
+                        pairs.add((i, j) if i < j else (j, i))
+
+
+class CandidateIndex:
+    """Inverted index over character n-grams and keyword sets.
+
+    Two blocking keys propose candidate pairs:
+    - keyword prefix filter: records are indexed on their rarest keywords only,
+      which is lossless for the keyword Jaccard threshold
+    - character n-grams: records sharing a reasonably rare n-gram of their
+      normalized text, which catches the SequenceMatcher ratio matches.
+      N-grams posted by more than max_postings records ("village", "community")
+      carry no signal and are skipped, except that every record keeps its
+      rarest n-grams so it is never left unindexed.
+    The n-gram blocking is lossy: a pair whose only shared n-grams have
+    capped posting lists is never proposed, so it can miss pairs that
+    SequenceMatcher would match (keyword matches never are). By default
+    max_postings grows slowly with the catalog size; pass a fixed max_postings
+    to trade recall for speed explicitly.
+    """
+
+    def __init__(self, jaccard_threshold=0.7, gram_size=4, max_postings=None, min_grams=3):
+        self.jaccard_threshold = jaccard_threshold
+        self.gram_size = gram_size
+        self.max_postings = max_postings
+        self.min_grams = min_grams
+        self.normalized = []
+        self.keywords = []
+
+    def build(self, normalized, keywords):
+        """Index the normalized strings and keyword sets of a catalog"""
+        self.normalized = list(normalized)
+        self.keywords = list(keywords)
+        return self
+
+    @property
+    def postings_limit(self):
+        """max_postings, or the default scaled to the indexed catalog"""
+        if self.max_postings is not None:
+            return self.max_postings
+        scale = (len(self.normalized) / POSTINGS_REFERENCE) ** 0.25
+        return max(MIN_POSTINGS, math.ceil(MIN_POSTINGS * scale))
+
+    def _gram_pairs(self, pairs, only=None):
+        """Pairs sharing a rare character n-gram"""
+        grams = [char_grams(text, self.gram_size) for text in self.normalized]
+        frequency = Counter(gram for record in grams for gram in record)
+        postings = defaultdict(list)
+        limit = self.postings_limit
+
+        for i, record in enumerate(grams):
+            ordered = sorted(record, key=lambda gram: (frequency[gram], gram))
+            for rank, gram in enumerate(ordered):
+                if rank >= self.min_grams and frequency[gram] > limit:
+                    break
+                postings[gram].append(i)
+
+        _postings_pairs(postings, pairs, only)
+
+    def _keyword_pairs(self, pairs, only=None):
+        """Pairs whose rarest keywords intersect (prefix filtering)"""
+        frequency = Counter(word for record in self.keywords for word in record)
+        postings = defaultdict(list)
+
+        for i, record in enumerate(self.keywords):
+            if not record:
+                continue  # keyword_overlap() scores empty sets as 0
+            # Jaccard >= t needs an overlap of at least ceil(t * |x|) keywords
+            need = max(1, math.ceil(self.jaccard_threshold * len(record) - EPSILON))
+            ordered = sorted(record, key=lambda word: (frequency[word], word))
+            for word in ordered[:len(ordered) - need + 1]:
+                postings[word].append(i)
+
+        _postings_pairs(postings, pairs, only)
+
+    def candidate_pairs(self, only=None):
+        """All proposed (i, j) pairs with i < j, or just those involving the indices in only"""
+        only = None if only is None else set(only)
+        pairs = set()
+        self._gram_pairs(pairs, only)
+        self._keyword_pairs(pairs, only)
+        return pairs
+
+    def neighbours(self):
+        """Map each index to its ascending list of later candidate indices"""
+        neighbours = defaultdict(list)
+        for i, j in sorted(self.candidate_pairs()):
+            neighbours[i].append(j)
+        return neighbours
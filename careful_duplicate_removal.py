@@ -3,62 +3,111 @@
 Careful Duplicate Removal - Surgical precision without breaking functionality
 """
 
+import argparse
 import re
+import shutil
+from bisect import bisect_right
 from difflib import SequenceMatcher
 import json
 
+import instrumentation
+from html_patcher import TextPatch, remove_records, set_total_count, write_atomically
+from initiatives_parser import parse_initiatives
+from instrumentation import STATS
+from scan_state import ScanState, record_key, state_path
+from scoring import SequenceScorer, bounded_ratio
+
+INDEX_PATH = '/workspace/index.html'
+BACKUP_PATH = '/workspace/index_backup.html'
+
+# A pair is a duplicate when its titles reach TITLE_ONLY_SIMILARITY, or reach
+# TITLE_SIMILARITY with descriptions reaching DESCRIPTION_SIMILARITY
+TITLE_SIMILARITY = 0.7
+TITLE_ONLY_SIMILARITY = 0.9
+DESCRIPTION_SIMILARITY = 0.8
+
+def clean_text(text):
+    """Lowercase and strip punctuation for comparison"""
+    return re.sub(r'[^\w\s]', '', text.lower())
+
 def similarity_score(a, b):
     """Calculate similarity between two strings"""
-    a_clean = re.sub(r'[^\w\s]', '', a.lower())
-    b_clean = re.sub(r'[^\w\s]', '', b.lower())
-    return SequenceMatcher(None, a_clean, b_clean).ratio()
+    return SequenceMatcher(None, clean_text(a), clean_text(b)).ratio()
 
-def extract_initiatives():
-    """Extract initiatives array safely"""
-    with open('/workspace/index.html', 'r') as f:
+def extract_initiatives(path=INDEX_PATH):
+    """Extract initiatives array safely, along with the parse it came from"""
+    with open(path, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    # Find the initiatives array boundaries
-    start_marker = 'const initiatives = ['
-    end_marker = '];'
-    
-    start_idx = content.find(start_marker)
-    end_idx = content.find(end_marker, start_idx) + len(end_marker)
-    
-    if start_idx == -1 or end_idx == -1:
+    try:
+        parsed = parse_initiatives(content)
+    except ValueError as error:
+        print(f"❌ Could not parse initiatives array: {error}")
+        return None, None
+    if parsed is None:
         print("❌ Could not find initiatives array")
-        return None, None, None
-    
-    before_array = content[:start_idx]
-    after_array = content[end_idx:]
-    
-    # Extract individual initiatives using regex
-    array_content = content[start_idx:end_idx]
-    
-    # Find all initiative objects
-    initiative_pattern = r'\s*{\s*title:\s*"([^"]+)",\s*description:\s*"([^"]+)",\s*category:\s*"([^"]+)",\s*impact:\s*"([^"]+)",\s*beneficiaries:\s*"([^"]+)",\s*icon:\s*"([^"]+)"\s*}'
+        return None, None
     
     initiatives = []
-    for match in re.finditer(initiative_pattern, array_content, re.DOTALL):
-        initiatives.append({
-            'title': match.group(1),
-            'description': match.group(2),
-            'category': match.group(3),
-            'impact': match.group(4),
-            'beneficiaries': match.group(5),
-            'icon': match.group(6),
-            'original_text': match.group(0)
-        })
+    for record in parsed:
+        initiative = record.to_dict()
+        initiative['original_text'] = parsed.raw(record)
+        initiatives.append(initiative)
     
     print(f"✅ Extracted {len(initiatives)} initiatives safely")
-    return initiatives, before_array, after_array
+    return initiatives, parsed
+
+def title_candidates(titles, removed, changed=None):
+    """Stage 1: yield (i, j, title_sim) for every pair whose titles reach 70%.
+
+    Titles are cleaned, counted and indexed once, so each pair only pays for
+    the length and character bounds unless it can actually qualify. With a sorted
+    list of changed indices, only pairs involving one of them are considered.
+    """
+    scorers = [SequenceScorer(title) for title in titles]
+    changed_lookup = set(changed or ())
+    for i in range(len(titles)):
+        if i in removed:
+            continue
+        if changed is None or i in changed_lookup:
+            later = range(i + 1, len(titles))
+        else:
+            later = changed[bisect_right(changed, i):]
+        STATS.add('pairs_considered', len(later))
+        for j in later:
+            if j in removed:
+                continue
+            title_sim = scorers[j].bounded_ratio(titles[i], TITLE_SIMILARITY, scorers[i].counts)
+            if title_sim is not None and title_sim >= TITLE_SIMILARITY:
+                yield i, j, title_sim
+
+def description_similarity(descriptions, i, j, title_sim):
+    """Stage 2: description score for a title-qualified pair, or None if it cannot qualify"""
+    if title_sim >= TITLE_ONLY_SIMILARITY:
+        # The title alone qualifies; the description is only reported
+        return SequenceMatcher(None, descriptions[i], descriptions[j]).ratio()
+    desc_sim = bounded_ratio(descriptions[i], descriptions[j], DESCRIPTION_SIMILARITY)
+    if desc_sim is None or desc_sim < DESCRIPTION_SIMILARITY:
+        return None
+    return desc_sim
 
-def find_duplicates_carefully(initiatives):
-    """Find duplicates with high precision"""
+def find_duplicates_carefully(initiatives, state=None):
+    """Find duplicates with high precision.
+
+    With a ScanState, the records that survived the previous run are known to
+    be pairwise distinct, so only pairs involving a new or changed record are
+    scored. The survivors of this run are saved back as the new state.
+    """
     print("\n🔍 CAREFUL DUPLICATE DETECTION")
     print("=" * 40)
     
-    duplicates_to_remove = []
+    keys = changed = None
+    if state is not None:
+        keys = [record_key(init['title'], init['description']) for init in initiatives]
+        changed = state.changed(keys)
+        print(f"🔁 Incremental scan: {len(changed)} of {len(initiatives)} initiatives new or changed")
+    
+    duplicates_to_remove = set()
     exact_duplicates = []
     near_duplicates = []
     
@@ -68,34 +117,37 @@ def find_duplicates_carefully(initiatives):
         title = init['title'].strip()
         if title in titles_seen:
             exact_duplicates.append((i, init, titles_seen[title], initiatives[titles_seen[title]]))
-            duplicates_to_remove.append(i)
+            duplicates_to_remove.add(i)
         else:
             titles_seen[title] = i
     
-    # Check for very similar titles (90%+ similarity)
-    for i in range(len(initiatives)):
-        if i in duplicates_to_remove:
+    # Check for very similar titles (90%+ similarity), or similar titles with
+    # similar descriptions. Pairs stream out of the title stage in (i, j) order,
+    # so removals made here are seen by every later pair.
+    titles = [clean_text(init['title']) for init in initiatives]
+    descriptions = [clean_text(init['description']) for init in initiatives]
+    for i, j, title_sim in title_candidates(titles, duplicates_to_remove, changed):
+        desc_sim = description_similarity(descriptions, i, j, title_sim)
+        if desc_sim is None:
             continue
-        for j in range(i + 1, len(initiatives)):
-            if j in duplicates_to_remove:
-                continue
-            
-            title_sim = similarity_score(initiatives[i]['title'], initiatives[j]['title'])
-            desc_sim = similarity_score(initiatives[i]['description'], initiatives[j]['description'])
-            
-            if title_sim >= 0.9 or (title_sim >= 0.7 and desc_sim >= 0.8):
-                near_duplicates.append((i, initiatives[i], j, initiatives[j], title_sim, desc_sim))
-                # Remove the shorter title (keep more descriptive)
-                if len(initiatives[i]['title']) >= len(initiatives[j]['title']):
-                    duplicates_to_remove.append(j)
-                else:
-                    duplicates_to_remove.append(i)
+        
+        near_duplicates.append((i, initiatives[i], j, initiatives[j], title_sim, desc_sim))
+        # Remove the shorter title (keep more descriptive)
+        if len(initiatives[i]['title']) >= len(initiatives[j]['title']):
+            duplicates_to_remove.add(j)
+        else:
+            duplicates_to_remove.add(i)
+    
+    if state is not None:
+        # Survivors never matched each other, so no pairs need to be kept
+        state.update(keys, [], covered=set(range(len(initiatives))) - duplicates_to_remove)
+        state.save()
     
     # Display findings
     print(f"📊 DUPLICATE ANALYSIS:")
     print(f"   Exact title duplicates: {len(exact_duplicates)}")
     print(f"   Near duplicates (90%+ similar): {len(near_duplicates)}")
-    print(f"   Total to remove: {len(set(duplicates_to_remove))}")
+    print(f"   Total to remove: {len(duplicates_to_remove)}")
     
     if exact_duplicates:
         print(f"\n🎯 EXACT DUPLICATES:")
@@ -107,51 +159,34 @@ def find_duplicates_carefully(initiatives):
         for i, (idx1, init1, idx2, init2, t_sim, d_sim) in enumerate(near_duplicates[:10], 1):
             print(f"   {i}. '{init1['title']}' ↔ '{init2['title']}' ({t_sim:.1%} similar)")
     
-    return sorted(set(duplicates_to_remove), reverse=True)  # Remove from end to preserve indices
+    return sorted(duplicates_to_remove, reverse=True)  # Remove from end to preserve indices
 
-def rebuild_array_carefully(initiatives, indices_to_remove):
-    """Rebuild the initiatives array without duplicates"""
+def rebuild_array_carefully(parsed, indices_to_remove):
+    """Page text without the duplicate records and with the count updated.
+
+    Only the removed records' spans change; the rest of the page, including
+    the statements after the array, is copied through untouched.
+    """
     print(f"\n🔧 REBUILDING ARRAY CAREFULLY")
     print("=" * 40)
     
-    # Remove duplicates (indices are sorted in reverse order)
-    for idx in indices_to_remove:
-        del initiatives[idx]
+    patch = TextPatch(parsed.text)
+    final_count = len(parsed) - remove_records(patch, parsed, indices_to_remove)
+    set_total_count(patch, final_count)
     
     print(f"✅ Removed {len(indices_to_remove)} duplicates")
-    print(f"📊 Final count: {len(initiatives)} unique initiatives")
-    
-    # Rebuild the JavaScript array
-    array_parts = ['        const initiatives = [']
+    print(f"📊 Final count: {final_count} unique initiatives")
     
-    for i, init in enumerate(initiatives):
-        comment = f"            // {init['title'].upper().replace(' ', ' ')}"
-        array_parts.append(comment)
-        array_parts.append('            {')
-        array_parts.append(f'                title: "{init["title"]}",')
-        array_parts.append(f'                description: "{init["description"]}",')
-        array_parts.append(f'                category: "{init["category"]}",')
-        array_parts.append(f'                impact: "{init["impact"]}",')
-        array_parts.append(f'                beneficiaries: "{init["beneficiaries"]}",')
-        array_parts.append(f'                icon: "{init["icon"]}"')
-        
-        if i < len(initiatives) - 1:
-            array_parts.append('            },')
-        else:
-            array_parts.append('            }')
-        array_parts.append('')
-    
-    array_parts.append('        ];')
-    
-    return '\n'.join(array_parts)
+    return patch.apply()
 
-def careful_duplicate_removal():
+def careful_duplicate_removal(incremental=False, path=INDEX_PATH, backup_path=BACKUP_PATH):
     """Main function for careful duplicate removal"""
     print("🎯 CAREFUL DUPLICATE REMOVAL - PRESERVING ALL FUNCTIONALITY")
     print("=" * 60)
     
     # Step 1: Extract safely
-    initiatives, before_array, after_array = extract_initiatives()
+    STATS.lap('extract')
+    initiatives, parsed = extract_initiatives(path)
     if not initiatives:
         return False
     
@@ -159,33 +194,29 @@ def careful_duplicate_removal():
     print(f"📊 Starting with: {original_count} initiatives")
     
     # Step 2: Find duplicates carefully
-    indices_to_remove = find_duplicates_carefully(initiatives)
+    STATS.lap('detect')
+    state = None
+    if incremental:
+        state = ScanState('careful', {
+            'title': TITLE_SIMILARITY, 'title_only': TITLE_ONLY_SIMILARITY, 'description': DESCRIPTION_SIMILARITY
+        })
+    indices_to_remove = find_duplicates_carefully(initiatives, state)
     
     if not indices_to_remove:
         print("✅ No duplicates found - catalog is already clean!")
         return True
     
-    # Step 3: Rebuild carefully
-    new_array = rebuild_array_carefully(initiatives, indices_to_remove)
-    
-    # Step 4: Reconstruct the full file
-    new_content = before_array + new_array + '\n\n        let filteredData = initiatives;' + after_array[2:]
-    
-    # Step 5: Update the count display
+    # Step 3: Rebuild carefully, patching the records out of the page
+    STATS.lap('rebuild')
+    new_content = rebuild_array_carefully(parsed, indices_to_remove)
     final_count = original_count - len(indices_to_remove)
-    new_content = re.sub(
-        r'<span class="stat-number" id="totalCount">\d+</span>',
-        f'<span class="stat-number" id="totalCount">{final_count}</span>',
-        new_content
-    )
     
-    # Step 6: Save with backup
-    import shutil
-    shutil.copy('/workspace/index.html', '/workspace/index_backup.html')
-    print("✅ Created backup: index_backup.html")
+    # Step 4: Save with backup
+    STATS.lap('save')
+    shutil.copy(path, backup_path)
+    print(f"✅ Created backup: {backup_path}")
     
-    with open('/workspace/index.html', 'w') as f:
-        f.write(new_content)
+    write_atomically(path, new_content)
     
     print(f"\n🎉 CAREFUL REMOVAL COMPLETE!")
     print(f"   Original: {original_count} initiatives")
@@ -197,4 +228,11 @@ def careful_duplicate_removal():
     return True
 
 if __name__ == "__main__":
-    success = careful_duplicate_removal()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Careful duplicate removal for index.html")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"only compare new or changed initiatives against the last run ({state_path('careful')})")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+    
+    success = STATS.run('careful_duplicate_removal', careful_duplicate_removal, incremental=args.incremental)
\ No newline at end of file
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Duplicate Clustering
+Disjoint-set grouping of matched pairs, split into groups whose members each match the kept entry
+"""
+
+
+class DisjointSet:
+    """Union-find over 0..n-1 with union by size and path halving"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item):
+        """Representative of item's set"""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Merge the sets of a and b; False if they were already together"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
+
+
+def cluster_pairs(count, pairs):
+    """Clusters of two or more items joined by the (i, j) pairs.
+
+    Each cluster is an ascending list of indices, and clusters are ordered by
+    their first index. Runs in near-linear time in count + len(pairs).
+    """
+    sets = DisjointSet(count)
+    for i, j in pairs:
+        sets.union(i, j)
+
+    members = {}
+    for item in range(count):
+        members.setdefault(sets.find(item), []).append(item)
+    return [cluster for cluster in members.values() if len(cluster) > 1]
+
+
+def split_cluster(cluster, matches, key):
+    """Split a connected cluster into groups that each match their representative.
+
+    A cluster only says its members are linked through some chain of matches;
+    A~B and B~C does not make C a duplicate of A. The member with the highest
+    key becomes a representative and takes every remaining member for which
+    matches(representative, member) holds; the rest are split again the same
+    way. Returns (groups, unmatched): each group starts with its representative,
+    and unmatched members matched no representative, only other duplicates.
+    """
+    remaining = sorted(cluster, key=lambda item: (-key(item), item))
+    groups = []
+    unmatched = []
+    while remaining:
+        representative, rest = remaining[0], remaining[1:]
+        group = [representative]
+        remaining = []
+        for item in rest:
+            (group if matches(representative, item) else remaining).append(item)
+        if len(group) > 1:
+            groups.append(group)
+        else:
+            unmatched.append(representative)
+    return groups, sorted(unmatched)
@@ -4,52 +4,193 @@ Comprehensive Duplicate Analysis Script
 Identifies duplicates between original 1250+ list and current 1091 catalog
 """
 
-import re
-from difflib import SequenceMatcher
+import argparse
+import math
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import json
 
+import instrumentation
+import neighbour_index
+import score_cache
+from instrumentation import STATS
+from keyword_matrix import KeywordMatrix
+from neighbour_index import NEIGHBOURS_K, NeighbourIndex
+from score_cache import SEQUENCE_RATIO, ScoreCache
+from text_features import CATALOG_PROFILE, FeatureStore, keyword_jaccard
+from tfidf_scorer import TfidfModel, top_k_neighbours
+
+PROFILE = CATALOG_PROFILE
+FEATURES = FeatureStore(PROFILE)
+
+# Match tiers of the report, strictest first: a match belongs to the first tier
+# whose similarity OR keyword cutoff it reaches, and the last tier decides
+# whether an original matches at all
+MATCH_TIERS = (
+    ('exact', 0.95, math.inf),
+    ('high', 0.8, 0.8),
+    ('medium', 0.7, 0.6),
+)
+MIN_SIMILARITY, MIN_KEYWORDS = MATCH_TIERS[-1][1:]
+
+# --sweep reports every cutoff from 95% down to the floor, in these steps
+SWEEP_FLOOR = 0.5
+SWEEP_STEP = 0.05
+SWEEP_SAMPLES = 2
+
 def normalize_text(text):
     """Normalize text for comparison"""
-    text = text.lower()
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'^(to |platform to |app to |initiative to |create |provide |support |distribute |sponsor |fund |organize |build |install |set up |establish )', '', text)
-    text = re.sub(r'(platform|app|initiative|program|system|network|bank|support|hub|tracker|fund|leaderboard)$', '', text)
-    text = text.strip()
-    return text
+    return FEATURES.get(text).normalized
 
 def similarity_score(a, b):
     """Calculate similarity between two strings"""
-    return SequenceMatcher(None, normalize_text(a), normalize_text(b)).ratio()
+    return FEATURES.scorer(b).ratio(FEATURES.get(a).normalized)
 
 def extract_keywords(text):
     """Extract key concepts from text"""
-    normalized = normalize_text(text)
-    # Common keywords that indicate similar concepts
-    keywords = set()
-    
-    # Add important terms
-    for word in normalized.split():
-        if len(word) > 3 and word not in ['with', 'from', 'this', 'that', 'will', 'have', 'been', 'they', 'them', 'their', 'these', 'those']:
-            keywords.add(word)
-    
-    return keywords
+    return FEATURES.get(text).keywords
 
 def keyword_overlap(text1, text2):
     """Calculate keyword overlap between two texts"""
-    keywords1 = extract_keywords(text1)
-    keywords2 = extract_keywords(text2)
+    return keyword_jaccard(FEATURES.get(text1), FEATURES.get(text2))
+
+def keyword_matrix(current):
+    """KeywordMatrix of the catalog, for keyword overlap of one original against every entry"""
+    return KeywordMatrix(FEATURES.build(current))
+
+def similarities(orig, current, cache=None, cutoff=0.0):
+    """similarity_score() of one original against every catalog entry, through a ScoreCache if given.
+
+    Pairs whose scoring bounds fall below cutoff come back as None without an
+    exact ratio, and the cache does not store them, so it only grows by pairs
+    that can match. The default cutoff of 0.0 scores every pair exactly.
+    """
+    normalized = normalize_text(orig)
+    counts = Counter(normalized)
+    def score(j):
+        return FEATURES.scorer(current[j]).bounded_ratio(normalized, cutoff, counts)
+    if cache is None:
+        return [score(j) for j in range(len(current))]
+    return cache.scores(normalized, [normalize_text(curr) for curr in current], score)
+
+def best_match(orig, current, cache=None, keywords=None):
+    """Best catalog match for one original initiative, or None.
+
+    Pass keyword_matrix(current) as keywords when matching many originals.
+    """
+    if keywords is None:
+        keywords = keyword_matrix(current)
+    best_matches = []
     
-    if not keywords1 or not keywords2:
-        return 0
+    scores = zip(current, similarities(orig, current, cache, MIN_SIMILARITY), keywords.overlap(FEATURES.get(orig)))
+    for j, (curr, similarity, keyword_sim) in enumerate(scores):
+        if similarity is None:
+            # Ruled out by the bounds: only a keyword match still needs the exact score
+            if keyword_sim < MIN_KEYWORDS:
+                continue
+            similarity = similarity_score(orig, curr)
+        if similarity >= MIN_SIMILARITY or keyword_sim >= MIN_KEYWORDS:
+            best_matches.append((j, curr, similarity, keyword_sim))
     
-    intersection = len(keywords1.intersection(keywords2))
-    union = len(keywords1.union(keywords2))
+    # Only the best is kept: max() returns the first of equals, as the stable sort did
+    return max(best_matches, key=lambda x: max(x[2], x[3])) if best_matches else None
+
+# Catalog shared with pool workers through the initializer
+_worker_current = None
+_worker_keywords = None
+
+def _init_worker(current):
+    """Hand the current catalog to a pool worker once"""
+    global _worker_current, _worker_keywords
+    _worker_current = current
+    _worker_keywords = keyword_matrix(current)
+
+def _score_chunk(chunk):
+    """Best matches for a chunk of original initiatives"""
+    return [best_match(orig, _worker_current, keywords=_worker_keywords) for orig in chunk]
+
+def tfidf_matches(original_full, current, k=5):
+    """Best match per original initiative by TF-IDF cosine, in the same form as best_match()"""
+    model = TfidfModel().fit([normalize_text(text) for text in original_full + current])
+    neighbours = top_k_neighbours(
+        model.transform([normalize_text(text) for text in original_full]),
+        model.transform([normalize_text(text) for text in current]),
+        k
+    )
+    
+    STATS.add('pairs_considered', len(original_full) * len(current))
+    results = []
+    for orig, row in zip(original_full, neighbours):
+        STATS.add('cosine_pairs', len(row))
+        best_matches = []
+        # Catalog order first, so ties resolve as they do in best_match()
+        for j, cosine in sorted(row):
+            keyword_sim = keyword_overlap(orig, current[j])
+            if cosine >= MIN_SIMILARITY or keyword_sim >= MIN_KEYWORDS:
+                best_matches.append((j, current[j], cosine, keyword_sim))
+        results.append(max(best_matches, key=lambda x: max(x[2], x[3])) if best_matches else None)
     
-    return intersection / union if union > 0 else 0
+    return results
+
+def neighbour_matches(original_full, current, index, k=NEIGHBOURS_K):
+    """Best match per original among its k nearest entries of a NeighbourIndex, in the same form as best_match().
 
-def find_comprehensive_duplicates():
-    """Comprehensive duplicate analysis"""
+    Only the neighbours get the similarity and keyword scores, so a match
+    outside an original's k nearest entries is missed.
+    """
+    STATS.add('pairs_considered', len(original_full) * len(current))
+    results = []
+    for orig in original_full:
+        normalized = normalize_text(orig)
+        counts = Counter(normalized)
+        # Catalog order first, so ties resolve as they do in best_match()
+        candidates = sorted(j for j, _, _ in index.query(orig, k))
+        STATS.add('neighbour_pairs', len(candidates))
+        best_matches = []
+        for j in candidates:
+            keyword_sim = keyword_overlap(orig, current[j])
+            similarity = FEATURES.scorer(current[j]).bounded_ratio(
+                normalized, MIN_SIMILARITY if keyword_sim < MIN_KEYWORDS else 0.0, counts
+            )
+            if similarity is not None and (similarity >= MIN_SIMILARITY or keyword_sim >= MIN_KEYWORDS):
+                best_matches.append((j, current[j], similarity, keyword_sim))
+        results.append(max(best_matches, key=lambda x: max(x[2], x[3])) if best_matches else None)
+    
+    return results
+
+def score_originals(original_full, current, workers=1, scorer='sequence', cache=None, neighbours=None):
+    """Best match per original initiative, optionally spread over a process pool.
+
+    With a NeighbourIndex of current, each original is only scored against
+    its nearest catalog entries.
+    """
+    if scorer == 'tfidf':
+        return tfidf_matches(original_full, current)
+    if neighbours is not None:
+        return neighbour_matches(original_full, current, neighbours)
+    STATS.add('pairs_considered', len(original_full) * len(current))
+    if workers <= 1:
+        keywords = keyword_matrix(current)
+        return [best_match(orig, current, cache, keywords) for orig in original_full]
+    
+    # Several chunks per worker keeps cores busy and the progress line moving
+    chunk_size = max(1, math.ceil(len(original_full) / (workers * 4)))
+    chunks = [original_full[k:k + chunk_size] for k in range(0, len(original_full), chunk_size)]
     
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(current,)) as executor:
+        # map() yields in submission order, so the merge matches the serial path exactly
+        for chunk_results in executor.map(_score_chunk, chunks):
+            results.extend(chunk_results)
+            print(f"\r⏳ Scored {len(results)}/{len(original_full)} originals", end='', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    
+    return results
+
+def read_lists():
+    """Original and current initiative lists"""
     # Read original initiatives (now comprehensive)
     with open('/workspace/full_original_list.txt', 'r') as f:
         original_full = [line.strip() for line in f if line.strip()]
@@ -58,6 +199,159 @@ def find_comprehensive_duplicates():
     with open('/workspace/current_initiatives.txt', 'r') as f:
         current = [line.strip() for line in f if line.strip()]
     
+    return original_full, current
+
+def score_table(original_full, current, floor=SWEEP_FLOOR, cache=None):
+    """Sparse (i, j, similarity, keyword_sim) table of every pair reaching the floor on either score.
+
+    Similarities that cannot reach the floor are cut short by the scoring
+    bounds and kept as 0, since no swept cutoff can use them.
+    """
+    keywords = keyword_matrix(current)
+    table = []
+    for i, orig in enumerate(original_full):
+        scores = [similarity or 0.0 for similarity in similarities(orig, current, cache, floor)]
+        
+        for j, (similarity, keyword_sim) in enumerate(zip(scores, keywords.overlap(FEATURES.get(orig)))):
+            if similarity >= floor or keyword_sim >= floor:
+                table.append((i, j, similarity, keyword_sim))
+    
+    return table
+
+def sweep_curve(table, column, cutoffs):
+    """(cutoff, duplicates, groups, marginal rows) at each cutoff for one score column of the table.
+
+    An original counts as a duplicate when its best score reaches the cutoff;
+    groups are the distinct catalog entries those best matches point at, and
+    the marginal rows are the matches that cutoff admits over the one above it.
+    """
+    best = {}
+    for row in table:
+        # The table is in (i, j) order, so ties keep the earliest catalog entry
+        if row[0] not in best or row[column] > best[row[0]][column]:
+            best[row[0]] = row
+    
+    curve = []
+    previous = math.inf
+    for cutoff in cutoffs:
+        matched = [row for row in best.values() if row[column] >= cutoff]
+        marginal = sorted((row for row in matched if row[column] < previous), key=lambda row: row[column])
+        curve.append((cutoff, len(matched), len({row[1] for row in matched}), marginal))
+        previous = cutoff
+    return curve
+
+def combined_matches(table, similarity_cutoff, keyword_cutoff):
+    """{original: row} of the originals with a row reaching either cutoff, as the report matches them.
+
+    Like best_match(), each original keeps its passing row with the highest
+    max(similarity, keyword_sim), the earliest catalog entry among equals.
+    """
+    chosen = {}
+    for row in table:
+        i, _, similarity, keyword_sim = row
+        if similarity >= similarity_cutoff or keyword_sim >= keyword_cutoff:
+            if i not in chosen or max(similarity, keyword_sim) > max(chosen[i][2], chosen[i][3]):
+                chosen[i] = row
+    return chosen
+
+def tier_curve(table):
+    """(tier, duplicates, groups, marginal rows) under each MATCH_TIERS rule, strictest first.
+
+    The rules are nested, so the marginal rows are the matches each tier's
+    rule admits over the stricter one before it.
+    """
+    curve = []
+    previous = {}
+    for name, similarity_cutoff, keyword_cutoff in MATCH_TIERS:
+        chosen = combined_matches(table, similarity_cutoff, keyword_cutoff)
+        marginal = sorted((row for i, row in chosen.items() if i not in previous), key=lambda row: max(row[2], row[3]))
+        curve.append((name, len(chosen), len({row[1] for row in chosen.values()}), marginal))
+        previous = chosen
+    return curve
+
+def sweep_grid(table, cutoffs):
+    """{(similarity cutoff, keyword cutoff): duplicates} under similarity OR keyword for every pair of cutoffs"""
+    best = {}
+    for i, _, similarity, keyword_sim in table:
+        top_similarity, top_keywords = best.get(i, (0, 0))
+        best[i] = (max(top_similarity, similarity), max(top_keywords, keyword_sim))
+    return {
+        (a, b): sum(1 for similarity, keyword_sim in best.values() if similarity >= a or keyword_sim >= b)
+        for a in cutoffs for b in cutoffs
+    }
+
+def sweep_thresholds(floor=SWEEP_FLOOR, cache=None):
+    """Score every pair once, then report matches at each cutoff down to the floor"""
+    STATS.lap('read lists')
+    original_full, current = read_lists()
+    
+    print(f"📊 THRESHOLD SWEEP")
+    print(f"=" * 50)
+    print(f"Original list: {len(original_full)} initiatives")
+    print(f"Current catalog: {len(current)} initiatives")
+    print()
+    
+    STATS.lap('scoring')
+    STATS.add('pairs_considered', len(original_full) * len(current))
+    table = score_table(original_full, current, floor, cache)
+    if cache is not None:
+        STATS.lap('score cache')
+        cache.save()
+        print(cache.summary())
+    print(f"Pairs at or above {floor:.0%}: {len(table)} of {len(original_full) * len(current)}")
+    print()
+    
+    STATS.lap('report')
+    # Cutoffs stay on the step grid and never go below the floor the table was built for
+    steps = int((0.95 - floor) / SWEEP_STEP + 1e-9)
+    cutoffs = [round(0.95 - k * SWEEP_STEP, 4) for k in range(steps + 1)]
+    curves = {}
+    for name, column in (('similarity', 2), ('keyword', 3)):
+        curve = curves[name] = sweep_curve(table, column, cutoffs)
+        print(f"🎚️ {name.upper()} CUTOFFS")
+        print("-" * 40)
+        print(f"{'Cutoff':>8} {'Duplicates':>11} {'Groups':>7} {'Unmatched':>10}")
+        for cutoff, duplicates, groups, marginal in curve:
+            print(f"{cutoff:>8.0%} {duplicates:>11} {groups:>7} {len(original_full) - duplicates:>10}")
+            # The weakest matches each cutoff admits show where precision starts to slip
+            for i, j, similarity, keyword_sim in marginal[:SWEEP_SAMPLES]:
+                print(f"         + {similarity:.1%}/{keyword_sim:.1%}  {original_full[i][:50]}  →  {current[j][:50]}")
+        print()
+    
+    # The report matches on similarity OR keywords, so the two cutoffs only mean
+    # something together: every pairing, with the report's own pairs starred
+    grid = curves['combined'] = sweep_grid(table, cutoffs)
+    tier_cutoffs = {(min_sim, min_kw) for _, min_sim, min_kw in MATCH_TIERS}
+    print("🎚️ COMBINED CUTOFFS (duplicates at similarity ≥ row OR keywords ≥ column)")
+    print("-" * 40)
+    print(f"{'Sim/KW':>8}" + ''.join(f"{b:>5.0%} " for b in cutoffs))
+    for a in cutoffs:
+        cells = ''.join(f"{grid[a, b]:>5}{'*' if (a, b) in tier_cutoffs else ' '}" for b in cutoffs)
+        print(f"{a:>8.0%}{cells}")
+    print("         * the report's own tier cutoffs")
+    print()
+    
+    curve = curves['tiers'] = tier_curve(table)
+    print("🎯 REPORT TIERS (similarity OR keyword cutoffs, as the report pairs them)")
+    print("-" * 40)
+    if floor > min(MIN_SIMILARITY, MIN_KEYWORDS):
+        print(f"   ⚠️ Rows below the {floor:.0%} floor are missing, so looser tiers are undercounted")
+    print(f"{'Tier':>8} {'Rule':>20} {'Duplicates':>11} {'Groups':>7} {'Unmatched':>10}")
+    for (name, duplicates, groups, marginal), (_, min_sim, min_kw) in zip(curve, MATCH_TIERS):
+        rule = f"{min_sim:.0%}" if min_kw == math.inf else f"{min_sim:.0%} or {min_kw:.0%}"
+        print(f"{name:>8} {rule:>20} {duplicates:>11} {groups:>7} {len(original_full) - duplicates:>10}")
+        for i, j, similarity, keyword_sim in marginal[:SWEEP_SAMPLES]:
+            print(f"         + {similarity:.1%}/{keyword_sim:.1%}  {original_full[i][:50]}  →  {current[j][:50]}")
+    print()
+    
+    return {'table': table, 'curves': curves}
+
+def find_comprehensive_duplicates(workers=1, scorer='sequence', cache=None, neighbours=None):
+    """Comprehensive duplicate analysis; neighbours is the directory of a neighbour index to query"""
+    
+    STATS.lap('read lists')
+    original_full, current = read_lists()
+    
     print(f"📊 COMPREHENSIVE DUPLICATE ANALYSIS")
     print(f"=" * 50)
     print(f"Original list: {len(original_full)} initiatives")
@@ -73,31 +367,34 @@ def find_comprehensive_duplicates():
     
     matched_current_indices = set()
     
-    for i, orig in enumerate(original_full):
-        best_matches = []
-        
-        for j, curr in enumerate(current):
-            similarity = similarity_score(orig, curr)
-            keyword_sim = keyword_overlap(orig, curr)
-            
-            if similarity >= 0.7 or keyword_sim >= 0.6:
-                best_matches.append((j, curr, similarity, keyword_sim))
-        
-        # Sort by best similarity
-        best_matches.sort(key=lambda x: max(x[2], x[3]), reverse=True)
-        
-        if best_matches:
-            j, curr, sim, kw_sim = best_matches[0]
+    index = None
+    if neighbours is not None:
+        # Reused while the catalog is unchanged, rebuilt and saved otherwise
+        STATS.lap('neighbour index')
+        index = NeighbourIndex.for_catalog(current, neighbours, PROFILE)
+        print(f"Neighbour index: {neighbours}, scoring the {NEIGHBOURS_K} nearest entries per original")
+        print()
+    
+    STATS.lap('scoring')
+    matches = score_originals(original_full, current, workers, scorer, cache, index)
+    if cache is not None:
+        STATS.lap('score cache')
+        cache.save()
+        print(cache.summary())
+        print()
+    STATS.lap('report')
+    
+    tiers = (exact_matches, high_similarity, medium_similarity)
+    for i, (orig, match) in enumerate(zip(original_full, matches)):
+        if match:
+            j, curr, sim, kw_sim = match
             
-            if sim >= 0.95:  # Exact match
-                exact_matches.append((i, orig, j, curr, sim, kw_sim))
-                matched_current_indices.add(j)
-            elif sim >= 0.8 or kw_sim >= 0.8:  # High similarity
-                high_similarity.append((i, orig, j, curr, sim, kw_sim))
-                matched_current_indices.add(j)
-            elif sim >= 0.7 or kw_sim >= 0.6:  # Medium similarity
-                medium_similarity.append((i, orig, j, curr, sim, kw_sim))
-                matched_current_indices.add(j)
+            # Exact, high, then medium similarity: the first tier the match reaches
+            for (_, min_sim, min_kw), tier in zip(MATCH_TIERS, tiers):
+                if sim >= min_sim or kw_sim >= min_kw:
+                    tier.append((i, orig, j, curr, sim, kw_sim))
+                    matched_current_indices.add(j)
+                    break
     
     # Display results
     print("🎯 EXACT MATCHES (95%+ similarity)")
@@ -164,4 +461,30 @@ def find_comprehensive_duplicates():
     }
 
 if __name__ == "__main__":
-    results = find_comprehensive_duplicates()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Comprehensive duplicate analysis")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes used for scoring (0 = all cores, default 1 = serial)")
+    parser.add_argument('--scorer', choices=('sequence', 'tfidf'), default='sequence',
+                        help="SequenceMatcher ratio, or TF-IDF cosine over words and character 3-grams")
+    parser.add_argument('--sweep', nargs='?', type=float, const=SWEEP_FLOOR, metavar='FLOOR',
+                        help=f"score every pair once and report each cutoff from 95%% down to FLOOR (default {SWEEP_FLOOR})")
+    score_cache.add_argument(parser)
+    neighbour_index.add_argument(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    if (args.score_cache or args.sweep is not None or args.neighbours) and (args.scorer != 'sequence' or args.workers != 1):
+        parser.error("--score-cache, --sweep and --neighbours only support the serial sequence scorer")
+    if args.neighbours and (args.score_cache or args.sweep is not None):
+        parser.error("--neighbours cannot be combined with --score-cache or --sweep")
+    if args.sweep is not None and not 0 < args.sweep <= 0.95:
+        parser.error("--sweep FLOOR must be in (0, 0.95]")
+    instrumentation.configure(args)
+    
+    cache = ScoreCache(*SEQUENCE_RATIO, path=args.score_cache) if args.score_cache else None
+    if args.sweep is not None:
+        results = STATS.run('comprehensive_analysis', sweep_thresholds, args.sweep, cache)
+    else:
+        results = STATS.run(
+            'comprehensive_analysis', find_comprehensive_duplicates,
+            workers=args.workers or os.cpu_count(), scorer=args.scorer, cache=cache, neighbours=args.neighbours
+        )
\ No newline at end of file
@@ -4,7 +4,8 @@ Comprehensive Cleanup Script
 Removes the major duplicates found in the internal analysis
 """
 
-import re
+from html_patcher import TextPatch, remove_records, set_total_count, write_atomically
+from initiatives_parser import parse_initiatives
 
 def comprehensive_cleanup():
     """Remove all identified duplicates"""
@@ -157,44 +158,43 @@ def comprehensive_cleanup():
         "Rural Complete Paradise Ecosystem"
     ]
     
+    try:
+        parsed = parse_initiatives(content)
+    except ValueError as error:
+        print(f"❌ Could not parse initiatives array: {error}")
+        return None
+    if parsed is None:
+        print("❌ Could not find initiatives array")
+        return None
+    
+    # Collect every removal from the single parse, then patch the file once
+    titles = parsed.by_title()
+    indices_to_remove = []
     removed_count = 0
     
     for duplicate_title in major_duplicates:
         print(f"🗑️ Removing: {duplicate_title}")
-        # Create a regex pattern to match the entire initiative block
-        pattern = rf'\s*{{\s*title:\s*"{re.escape(duplicate_title)}",.*?\n\s*}},?\s*'
-        before_count = len(re.findall(r'title:\s*"', content))
-        content = re.sub(pattern, '', content, flags=re.DOTALL)
-        after_count = len(re.findall(r'title:\s*"', content))
+        matches = titles.get(duplicate_title, [])
+        indices_to_remove.extend(record.index for record in matches)
         
-        if before_count > after_count:
+        if matches:
             removed_count += 1
     
-    # Clean up formatting issues
-    content = re.sub(r',\s*,', ',', content)
-    content = re.sub(r',\s*\]', ']', content)
-    content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)  # Remove excessive blank lines
-    
-    # Count final initiatives
-    final_count = len(re.findall(r'title:\s*"', content))
+    patch = TextPatch(content)
+    final_count = len(parsed) - remove_records(patch, parsed, indices_to_remove)
     
     print(f"\n📊 COMPREHENSIVE CLEANUP SUMMARY")
     print("-" * 40)
     print(f"Major duplicates targeted for removal: {len(major_duplicates)}")
     print(f"Successfully removed: {removed_count}")
     print(f"Final optimized count: {final_count}")
-    print(f"Total reduction: {1082 - final_count} initiatives")
+    print(f"Total reduction: {len(parsed) - final_count} initiatives")
     
     # Update the stat display
-    content = re.sub(
-        r'<span class="stat-number" id="totalCount">\d+</span>',
-        f'<span class="stat-number" id="totalCount">{final_count}</span>',
-        content
-    )
+    set_total_count(patch, final_count)
     
     # Save the optimized content
-    with open('/workspace/index.html', 'w') as f:
-        f.write(content)
+    write_atomically('/workspace/index.html', patch.apply())
     
     print(f"✅ Catalog optimized to {final_count} unique, high-quality initiatives!")
     return final_count
@@ -4,25 +4,35 @@ Comprehensive scan for any remaining duplicates
 Final quality assurance for the catalog
 """
 
-import re
-from difflib import SequenceMatcher
+import argparse
 from collections import defaultdict
 
+import instrumentation
+from initiatives_parser import load_initiatives
+from instrumentation import STATS
+from scan_state import ScanState, record_key, state_path
+from scoring import SequenceScorer
+
+# Title similarity at which two initiatives are reported
+SIMILAR_TITLES = 0.9
+
 def extract_all_initiatives():
     """Extract all initiatives from the current file"""
-    with open('/workspace/index.html', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Extract initiative objects
-    pattern = r'\{[^{}]*?title:\s*"([^"]*)"[^{}]*?description:\s*"([^"]*)"[^{}]*?\}'
-    matches = re.findall(pattern, content, re.DOTALL)
+    try:
+        parsed = load_initiatives('/workspace/index.html')
+    except ValueError as error:
+        print(f"❌ Could not parse initiatives array: {error}")
+        return []
+    if parsed is None:
+        return []
     
     initiatives = []
-    for i, (title, description) in enumerate(matches):
+    for record in parsed:
+        description = record.description.strip()
         initiatives.append({
-            'index': i,
-            'title': title.strip(),
-            'description': description.strip()[:200] + "..." if len(description.strip()) > 200 else description.strip()
+            'index': record.index,
+            'title': record.title.strip(),
+            'description': description[:200] + "..." if len(description) > 200 else description
         })
     
     return initiatives
@@ -36,27 +46,62 @@ def find_exact_duplicates(initiatives):
     
     return {title: inits for title, inits in title_groups.items() if len(inits) > 1}
 
-def find_highly_similar(initiatives, threshold=0.9):
-    """Find initiatives with very similar titles"""
-    similar_pairs = []
+def find_highly_similar(initiatives, threshold=SIMILAR_TITLES, state=None):
+    """Find initiatives with very similar titles.
+
+    With a ScanState, pairs of titles the previous scan already compared are
+    taken from it and only pairs involving new or changed titles are scored.
+    """
+    titles = [init['title'].lower() for init in initiatives]
+    # Pair (i, j) is scored against j's scorer, so each title is indexed once;
+    # pairs the length and character bounds keep below threshold come back as None
+    scorers = [SequenceScorer(title) for title in titles]
     
-    for i, init1 in enumerate(initiatives):
-        for j, init2 in enumerate(initiatives[i+1:], i+1):
-            similarity = SequenceMatcher(None, init1['title'].lower(), init2['title'].lower()).ratio()
-            if similarity >= threshold:
-                similar_pairs.append((init1, init2, similarity))
+    if state is None:
+        STATS.add('pairs_considered', len(titles) * (len(titles) - 1) // 2)
+        similar_pairs = []
+        for i, init1 in enumerate(initiatives):
+            for j, init2 in enumerate(initiatives[i+1:], i+1):
+                similarity = scorers[j].bounded_ratio(titles[i], threshold, scorers[i].counts)
+                if similarity is not None and similarity >= threshold:
+                    similar_pairs.append((init1, init2, similarity))
+        return similar_pairs
     
-    return similar_pairs
+    keys = [record_key(title) for title in titles]
+    changed = state.changed(keys)
+    matches = state.known_matches(keys, changed)
+    print(f"🔁 Incremental scan: {len(changed)} of {len(initiatives)} titles new or changed\n")
+    
+    changed_set = set(changed)
+    for k, i in enumerate(changed):
+        # Every title but itself and the k changed ones before it
+        STATS.add('pairs_considered', len(initiatives) - 1 - k)
+        for j in range(len(initiatives)):
+            # Pairs of two changed titles are scored once, from the earlier one
+            if j == i or (j in changed_set and j < i):
+                continue
+            a, b = min(i, j), max(i, j)
+            similarity = scorers[b].bounded_ratio(titles[a], threshold, scorers[a].counts)
+            if similarity is not None and similarity >= threshold:
+                matches.append((a, b, similarity))
+    
+    state.update(keys, matches)
+    state.save()
+    
+    matches.sort(key=lambda match: (match[0], match[1]))
+    return [(initiatives[i], initiatives[j], similarity) for i, j, similarity in matches]
 
-def main():
+def main(incremental=False):
     """Main scan function"""
     print("🔍 COMPREHENSIVE DUPLICATE SCAN")
     print("Scanning current catalog for any remaining duplicates...\n")
     
+    STATS.lap('extract')
     initiatives = extract_all_initiatives()
     print(f"📊 Scanning {len(initiatives)} initiatives\n")
     
     # Check for exact duplicates
+    STATS.lap('exact titles')
     exact_dupes = find_exact_duplicates(initiatives)
     print("1️⃣ EXACT DUPLICATE TITLES:")
     if exact_dupes:
@@ -70,7 +115,12 @@ def main():
     print()
     
     # Check for highly similar titles
-    similar_pairs = find_highly_similar(initiatives, 0.9)
+    STATS.lap('similar titles')
+    state = None
+    if incremental:
+        state = ScanState('comprehensive', {'title': SIMILAR_TITLES})
+    similar_pairs = find_highly_similar(initiatives, SIMILAR_TITLES, state)
+    STATS.lap('report')
     print("2️⃣ HIGHLY SIMILAR TITLES (>90% similarity):")
     if similar_pairs:
         for init1, init2, similarity in similar_pairs:
@@ -94,4 +144,11 @@ def main():
     return exact_dupes, similar_pairs
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Comprehensive duplicate scan of index.html")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"only compare new or changed titles against the last scan ({state_path('comprehensive')})")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+    
+    STATS.run('comprehensive_duplicate_scan', main, incremental=args.incremental)
\ No newline at end of file
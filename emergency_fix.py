@@ -6,49 +6,42 @@ Create a minimal working version that definitely loads
 
 import re
 
+from initiatives_parser import parse_initiatives
+
 def create_minimal_working_version():
     """Create a minimal working version with just the first 50 initiatives"""
     
     with open('/workspace/index.html', 'r', encoding='utf-8') as f:
         content = f.read()
     
-    # Extract first 50 initiatives only
-    pattern = r'(\{[^{}]*title:[^{}]*\}),?'
-    matches = re.findall(pattern, content, re.DOTALL)
+    try:
+        parsed = parse_initiatives(content)
+    except ValueError as error:
+        print(f"❌ Could not parse initiatives array: {error}")
+        return
+    if parsed is None:
+        print("❌ Could not find initiatives array")
+        return
     
-    print(f"Found {len(matches)} initiative objects")
+    print(f"Found {len(parsed)} initiative objects")
     
     # Take only first 50 to ensure it works
-    working_initiatives = matches[:50]
+    working_initiatives = [parsed.raw(record) for record in parsed.records[:50]]
     
     # Create clean JavaScript array
     js_array = "const initiatives = [\n"
     
-    for i, match in enumerate(working_initiatives):
-        # Clean up the match
-        clean_match = match.strip().rstrip(',')
-        js_array += "            " + clean_match
+    for i, record_text in enumerate(working_initiatives):
+        js_array += "            " + record_text
         if i < len(working_initiatives) - 1:
             js_array += ","
         js_array += "\n"
     
     js_array += "        ];"
     
-    # Find the initiatives array in the original content
-    start_pattern = r'const initiatives = \['
-    end_pattern = r'\];'
-    
-    start_match = re.search(start_pattern, content)
-    if not start_match:
-        print("❌ Could not find initiatives array")
-        return
-    
-    # Find the end position (simplified approach)
-    end_pos = content.find('];', start_match.start()) + 2
-    
     # Replace the array
-    before_array = content[:start_match.start()]
-    after_array = content[end_pos:]
+    before_array = content[:parsed.start]
+    after_array = content[parsed.end:]
     
     new_content = before_array + js_array + after_array
     
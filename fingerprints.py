@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Content Fingerprints for Initiatives
+Stable 64-bit hashes of normalized fields, cached in a sidecar file between cleanups
+"""
+
+import hashlib
+import json
+import os
+import zlib
+
+from html_patcher import write_atomically
+from initiatives_parser import FIELDS
+from text_features import WHITESPACE_RE
+
+FINGERPRINT_VERSION = 2
+
+# Joins fields before hashing; it never appears in initiative text
+FIELD_SEPARATOR = '\x1f'
+
+
+def normalize_field(text):
+    """Lowercase, trim and collapse whitespace, as duplicate signatures always have"""
+    return WHITESPACE_RE.sub(' ', text.lower().strip())
+
+
+def fingerprint(text):
+    """Stable 64-bit hash of a string (unlike hash(), the same in every run)"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class RecordFingerprint:
+    """Hashes of one initiative's normalized title, description and full record"""
+
+    __slots__ = ('title', 'description', 'record')
+
+    def __init__(self, title, description, record):
+        self.title = title
+        self.description = description
+        self.record = record
+
+    @classmethod
+    def of(cls, initiative):
+        """Fingerprint a dict of initiative fields"""
+        values = [normalize_field(initiative.get(field, '')) for field in FIELDS]
+        return cls(
+            fingerprint(values[FIELDS.index('title')]),
+            fingerprint(values[FIELDS.index('description')]),
+            fingerprint(FIELD_SEPARATOR.join(values)),
+        )
+
+    @property
+    def signature(self):
+        """Key shared by entries with the same title and description"""
+        return self.title, self.description
+
+    def to_json(self):
+        return [f'{value:016x}' for value in (self.title, self.description, self.record)]
+
+    @classmethod
+    def from_json(cls, values):
+        return cls(*(int(value, 16) for value in values))
+
+
+class FingerprintStore:
+    """Sidecar cache of fingerprints, keyed by each record's source length and CRC-32.
+
+    A record whose source is unchanged since the last run reuses its stored
+    fingerprints and is never normalized again. The key is a checksum rather
+    than a position, so records that moved after a removal still hit; a
+    checksum collision can only hide a duplicate, since matches are confirmed
+    on the text. Entries for records that were not seen in this run are
+    dropped on save.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError:
+                data = {}
+            if data.get('version') == FINGERPRINT_VERSION:
+                self.entries = data.get('records', {})
+
+    def get(self, source, initiative):
+        """Fingerprints of a record, from the sidecar when its source is unchanged"""
+        key = f'{len(source):x}:{zlib.crc32(source.encode("utf-8")):08x}'
+        stored = self.entries.get(key)
+        if stored is not None:
+            self.hits += 1
+            record = RecordFingerprint.from_json(stored)
+        else:
+            self.misses += 1
+            record = RecordFingerprint.of(initiative)
+        self.used[key] = record
+        return record
+
+    def save(self):
+        """Write the fingerprints used in this run back to the sidecar"""
+        data = {
+            'version': FINGERPRINT_VERSION,
+            'records': {key: record.to_json() for key, record in self.used.items()},
+        }
+        write_atomically(self.path, json.dumps(data, separators=(',', ':')))
@@ -5,6 +5,8 @@ Fix JavaScript errors in the HTML file
 
 import re
 
+from multi_replace import JSON_CLEANUP, Rewriter
+
 def fix_javascript_errors():
     """Fix broken JavaScript structure and malformed comments"""
     
@@ -160,15 +162,14 @@ def fix_javascript_errors():
         )
     ]
     
-    # Apply all fixes
-    for old, new in fixes:
-        if old in content:
-            content = content.replace(old, new)
-            print(f"✅ Fixed: {old[:50]}...")
-    
-    # Clean up any remaining JSON syntax issues
-    content = re.sub(r',\s*,', ',', content)
-    content = re.sub(r',\s*\]', ']', content)
+    # Apply all fixes and clean up any remaining JSON syntax issues in one pass
+    content, hits = Rewriter(fixes, JSON_CLEANUP).apply(content)
+    for (old, _), count in zip(fixes, hits):
+        if count:
+            print(f"✅ Fixed: {old[:50]}... ({count}x)")
+    for (pattern, _), count in zip(JSON_CLEANUP, hits[len(fixes):]):
+        if count:
+            print(f"🧹 Cleaned up {pattern}: {count}x")
     
     # Count final initiatives
     final_count = len(re.findall(r'title:\s*"', content))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Offset-Based Patching for index.html
+Collects deletions/insertions from a single parse and applies them in one pass
+"""
+
+import os
+import re
+import shutil
+import tempfile
+
+TOTAL_COUNT_RE = re.compile(r'(<span class="stat-number" id="totalCount">)\d+(</span>)')
+
+
+class TextPatch:
+    """Non-overlapping edits against one text, applied together into a single buffer"""
+
+    def __init__(self, text):
+        self.text = text
+        self.edits = []
+
+    def replace(self, start, end, replacement):
+        """Replace text[start:end] with replacement"""
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError(f"Edit range {start}:{end} is outside the text")
+        self.edits.append((start, end, replacement))
+
+    def delete(self, start, end):
+        """Remove text[start:end]"""
+        self.replace(start, end, '')
+
+    def insert(self, position, insertion):
+        """Insert text before position"""
+        self.replace(position, position, insertion)
+
+    def apply(self):
+        """Patched text, built in one pass over the original"""
+        parts = []
+        position = 0
+        # Insertions sort before a deletion starting at the same offset
+        for start, end, replacement in sorted(self.edits, key=lambda edit: (edit[0], edit[1])):
+            if start < position:
+                raise ValueError(f"Overlapping edits at offset {start}")
+            parts.append(self.text[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(self.text[position:])
+        return ''.join(parts)
+
+
+def remove_records(patch, parsed, indices):
+    """Queue deletion of the given records, keeping the array's commas valid.
+
+    Consecutive removed records are deleted as one run together with their
+    leading comments. A run that ends the array takes the comma of the record
+    before it instead of its own, so no trailing comma is left behind.
+    """
+    records = parsed.records
+    indices = sorted(set(indices))
+    runs = []
+    for index in indices:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1][1] = index
+        else:
+            runs.append([index, index])
+
+    for first, last in runs:
+        if last < len(records) - 1:
+            patch.delete(records[first].block_start, records[last].comma_end)
+        elif first > 0:
+            patch.delete(records[first - 1].end, records[last].end)
+        else:
+            patch.delete(records[first].block_start, records[last].end)
+
+    return len(indices)
+
+
+def set_total_count(patch, count):
+    """Queue an update of the totalCount stat display, if the page has one"""
+    match = TOTAL_COUNT_RE.search(patch.text)
+    if match:
+        patch.replace(match.start(), match.end(), f'{match.group(1)}{count}{match.group(2)}')
+    return bool(match)
+
+
+def write_atomically(path, content):
+    """Write content through a temporary file so readers never see a half-written page"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            # mkstemp creates owner-only files; give new files the usual permissions
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Initiatives Array Parser
+Single-pass tokenizer for the `const initiatives = [...]` literal in index.html
+"""
+
+import json
+import re
+
+# Fields every initiative card renders
+FIELDS = ('title', 'description', 'category', 'impact', 'beneficiaries', 'icon')
+
+TOKEN_RE = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<punct>[{}\[\]:,;])
+  | (?P<word>[^\s{}\[\]:,;"'/]+)
+''', re.VERBOSE | re.DOTALL)
+
+# One JavaScript string escape: \xHH, \uHHHH, \u{H...} or a single character
+JS_ESCAPE_RE = re.compile(r'\\(?:x([0-9a-fA-F]{2})|u([0-9a-fA-F]{4})|u\{([0-9a-fA-F]+)\}|(\r\n|.))', re.DOTALL)
+
+# Single-character escapes with a meaning of their own; a backslash before a
+# line break continues the string, and any other character stands for itself
+JS_SIMPLE_ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0',
+    '\n': '', '\r': '', '\r\n': '', '\u2028': '', '\u2029': '',
+}
+
+
+class Initiative:
+    """One object literal of the initiatives array.
+
+    Field values are the raw text between the quotes, exactly as written.
+    Offsets are character indices into the parsed str, not byte offsets: every
+    caller slices and patches the decoded text, and the emoji icons make the
+    two differ. Encode text[:offset] to get a byte position. The offsets are:
+    - start/end: the `{...}` object itself
+    - block_start: just after the previous separator, so text[block_start:end]
+      also covers the comment and whitespace leading into the object
+    - comma_end: just after the trailing comma, or end when there is none
+    """
+
+    __slots__ = FIELDS + ('index', 'extra', 'start', 'end', 'block_start', 'comma_end')
+
+    def __init__(self, index, values, start, end, block_start):
+        self.index = index
+        for field in FIELDS:
+            setattr(self, field, values.pop(field, ''))
+        self.extra = values
+        self.start = start
+        self.end = end
+        self.block_start = block_start
+        self.comma_end = end
+
+    def to_dict(self):
+        """Plain dict of the card fields, as the scripts used to build"""
+        return {field: getattr(self, field) for field in FIELDS}
+
+
+class InitiativesArray:
+    """The parsed array and where it sits in the text.
+
+    start is the `const` keyword, end is just after the closing `];`
+    (or `]` when the statement has no semicolon).
+    """
+
+    __slots__ = ('text', 'records', 'start', 'open_bracket', 'close_bracket', 'end')
+
+    def __init__(self, text, records, start, open_bracket, close_bracket, end):
+        self.text = text
+        self.records = records
+        self.start = start
+        self.open_bracket = open_bracket
+        self.close_bracket = close_bracket
+        self.end = end
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def by_title(self):
+        """Map each title to its records, in array order"""
+        titles = {}
+        for record in self.records:
+            titles.setdefault(record.title, []).append(record)
+        return titles
+
+    def raw(self, record):
+        """Source text of one record's object literal"""
+        return self.text[record.start:record.end]
+
+
+def _tokens(text, pos):
+    """Yield (kind, value, start, end) for every significant token from pos onwards"""
+    length = len(text)
+    while pos < length:
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise ValueError(f"Unexpected character {text[pos]!r} at offset {pos}")
+        kind = match.lastgroup
+        if kind not in ('space', 'comment'):
+            yield kind, match.group(), match.start(), match.end()
+        pos = match.end()
+
+
+def _next(tokens):
+    """Next token, failing loudly if the array is cut short"""
+    token = next(tokens, None)
+    if token is None:
+        raise ValueError("Unexpected end of text inside the initiatives array")
+    return token
+
+
+def _expect(tokens, *values):
+    """Next token, which must be one of the given punctuation values"""
+    token = _next(tokens)
+    if token[0] != 'punct' or token[1] not in values:
+        raise ValueError(f"Expected {' or '.join(values)} at offset {token[2]}, found {token[1][:20]!r}")
+    return token
+
+
+def _scalar(token):
+    """Raw value of a string or bare-word token"""
+    kind, value, start, _ = token
+    if kind == 'string':
+        return value[1:-1]
+    if kind == 'word':
+        return value
+    raise ValueError(f"Expected a value at offset {start}, found {value[:20]!r}")
+
+
+def _parse_object(tokens, index, start, block_start):
+    """Parse the body of an object literal whose `{` has been consumed"""
+    values = {}
+    while True:
+        token = _next(tokens)
+        if token[0] == 'punct' and token[1] == '}':
+            return Initiative(index, values, start, token[3], block_start)
+
+        key = _scalar(token)
+        _expect(tokens, ':')
+        values[key] = _scalar(_next(tokens))
+
+        separator = _expect(tokens, ',', '}')
+        if separator[1] == '}':
+            return Initiative(index, values, start, separator[3], block_start)
+
+
+def parse_initiatives(text, name='initiatives'):
+    """Parse the named array literal in one linear pass, or None if it is missing"""
+    declaration = re.search(rf'\b(?:const|let|var)\s+{re.escape(name)}\s*=\s*\[', text)
+    if not declaration:
+        return None
+
+    open_bracket = declaration.end() - 1
+    tokens = _tokens(text, declaration.end())
+    records = []
+    block_start = declaration.end()
+
+    while True:
+        token = _expect(tokens, '{', ']')
+        if token[1] == ']':
+            close_bracket = token[2]
+            break
+
+        record = _parse_object(tokens, len(records), token[2], block_start)
+        records.append(record)
+
+        separator = _expect(tokens, ',', ']')
+        if separator[1] == ']':
+            close_bracket = separator[2]
+            break
+        record.comma_end = block_start = separator[3]
+
+    end = close_bracket + 1
+    semicolon = re.compile(r'\s*;').match(text, end)
+    if semicolon:
+        end = semicolon.end()
+
+    return InitiativesArray(text, records, declaration.start(), open_bracket, close_bracket, end)
+
+
+def decode_value(raw):
+    """Turn a raw field value into the string the browser sees"""
+    if '\\' not in raw:
+        return raw
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        # JS-only escapes such as \' or a raw tab: decode the JavaScript way
+        return _decode_js(raw)
+
+
+def _decode_js(raw):
+    """Decode the escapes of a JavaScript string literal body"""
+    def escape(match):
+        hex_byte, hex_unit, code_point, char = match.groups()
+        if char is not None:
+            return JS_SIMPLE_ESCAPES.get(char, char)
+        return chr(int(hex_byte or hex_unit or code_point, 16))
+
+    decoded = JS_ESCAPE_RE.sub(escape, raw)
+    # \uD83D\uDE00 decodes to two surrogates; pair them into one character
+    return decoded.encode('utf-16', 'surrogatepass').decode('utf-16')
+
+
+def load_initiatives(path, name='initiatives'):
+    """Read a file and parse its initiatives array"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_initiatives(f.read(), name)
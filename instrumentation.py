@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Instrumentation for the Dedup Scripts
+Stage timers, hot-path counters and optional profiling, switched on by DEDUP_STATS / DEDUP_PROFILE or --stats / --profile
+"""
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+
+STATS_ENV = 'DEDUP_STATS'
+PROFILE_ENV = 'DEDUP_PROFILE'
+
+# DEDUP_STATS values that mean "print the summary" rather than a JSON path
+ENABLED_VALUES = ('1', 'true', 'yes', 'on', '-')
+
+
+class Instrumentation:
+    """Per-stage timers and counters for one script run.
+
+    Nothing is wrapped until stats are enabled: the hot paths (SequenceMatcher.ratio,
+    normalization, the initiatives tokenizer and the scoring bounds) are patched
+    in place then, so a run without stats executes exactly the original code.
+    run() puts the originals back when the script finishes.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.json_path = None
+        self.profile_path = None
+        self.timers = {}
+        self.counters = Counter()
+        self._stage = None
+        self._stage_start = 0.0
+        self._hooks = []
+
+    def configure(self, stats=None, profile=None):
+        """Turn on stats (True, or a JSON output path) and/or profiling to a file"""
+        if stats:
+            self.enabled = True
+            if isinstance(stats, str) and stats.lower() not in ENABLED_VALUES:
+                self.json_path = stats
+            self._install_hooks()
+        if profile:
+            self.profile_path = profile
+
+    def add(self, name, amount=1):
+        """Bump a counter; call at stage or row granularity, never per pair"""
+        if self.enabled:
+            self.counters[name] += amount
+
+    def lap(self, name):
+        """End the current stage and start timing the named one (None just ends it)"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._stage is not None:
+            self.timers[self._stage] = self.timers.get(self._stage, 0.0) + now - self._stage_start
+        self._stage = name
+        self._stage_start = now
+
+    def _time(self, name, started):
+        key = f'hot:{name}'
+        self.timers[key] = self.timers.get(key, 0.0) + time.perf_counter() - started
+
+    def _patch(self, owner, name, wrapper):
+        """Replace owner.name with wrapper, remembering the original for remove_hooks()"""
+        self._hooks.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, wrapper)
+
+    def remove_hooks(self):
+        """Put back every hot path _install_hooks() wrapped"""
+        while self._hooks:
+            owner, name, original = self._hooks.pop()
+            setattr(owner, name, original)
+
+    def _install_hooks(self):
+        """Wrap the hot paths so they count and time themselves"""
+        if self._hooks:
+            return
+
+        import initiatives_parser
+        import scoring
+        from text_features import NormalizationProfile
+
+        ratio = SequenceMatcher.ratio
+        @functools.wraps(ratio)
+        def counted_ratio(matcher):
+            started = time.perf_counter()
+            try:
+                return ratio(matcher)
+            finally:
+                self.counters['ratio_calls'] += 1
+                self._time('SequenceMatcher.ratio', started)
+        self._patch(SequenceMatcher, 'ratio', counted_ratio)
+
+        normalize = NormalizationProfile.normalize
+        @functools.wraps(normalize)
+        def counted_normalize(profile, text):
+            started = time.perf_counter()
+            try:
+                return normalize(profile, text)
+            finally:
+                self.counters['normalize_calls'] += 1
+                self.counters['regex_scans'] += 3
+                self._time('normalize', started)
+        self._patch(NormalizationProfile, 'normalize', counted_normalize)
+
+        tokens = initiatives_parser._tokens
+        @functools.wraps(tokens)
+        def counted_tokens(text, pos):
+            started = time.perf_counter()
+            # The parser stops at the closing bracket without exhausting the
+            # tokens, so the time is taken when the generator is closed
+            try:
+                for token in tokens(text, pos):
+                    self.counters['regex_scans'] += 1
+                    yield token
+            finally:
+                self._time('initiatives parsing', started)
+        self._patch(initiatives_parser, '_tokens', counted_tokens)
+
+        # bounded_ratio() looks both up as module globals, so wrapping them here
+        # tells how many pairs it saw and how many survived the bounds
+        length_bound = scoring.length_bound
+        @functools.wraps(length_bound)
+        def counted_length_bound(a, b):
+            self.counters['pairs_bounded'] += 1
+            return length_bound(a, b)
+        self._patch(scoring, 'length_bound', counted_length_bound)
+
+        exact_ratio = scoring._exact_ratio
+        @functools.wraps(exact_ratio)
+        def counted_exact_ratio(a, b, matcher=None):
+            self.counters['pairs_past_bounds'] += 1
+            return exact_ratio(a, b, matcher)
+        self._patch(scoring, '_exact_ratio', counted_exact_ratio)
+
+    def summary(self):
+        """JSON-ready counters and timings"""
+        counters = dict(self.counters)
+        if 'pairs_bounded' in counters:
+            counters['pairs_pruned'] = counters['pairs_bounded'] - counters.get('pairs_past_bounds', 0)
+        return {
+            'stages': {name: round(seconds, 4) for name, seconds in self.timers.items() if not name.startswith('hot:')},
+            'hot_paths': {name[4:]: round(seconds, 4) for name, seconds in self.timers.items() if name.startswith('hot:')},
+            'counters': counters,
+        }
+
+    def report(self, script):
+        """Print the summary after the script's own report, and write the JSON if asked"""
+        summary = {'script': script, **self.summary()}
+        print(f"\n⏱️  INSTRUMENTATION: {script}")
+        print("-" * 40)
+        for name, seconds in summary['stages'].items():
+            print(f"   {name}: {seconds:.3f}s")
+        for name, seconds in summary['hot_paths'].items():
+            print(f"   ↳ in {name}: {seconds:.3f}s")
+        for name, value in sorted(summary['counters'].items()):
+            print(f"   {name}: {value:,}")
+        if self.json_path:
+            with open(self.json_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            print(f"   📄 JSON summary: {self.json_path}")
+
+    def run(self, script, func, *args, **kwargs):
+        """Call a script's main function under the configured stats and profiler"""
+        if not self.enabled and not self.profile_path:
+            return func(*args, **kwargs)
+
+        if self.enabled:
+            self._install_hooks()
+        profiler = None
+        if self.profile_path:
+            profiler = _start_profiler(self.profile_path)
+        started = time.perf_counter()
+        self.lap('startup')
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                _stop_profiler(profiler, self.profile_path)
+            if self.enabled:
+                self.lap(None)
+                self.timers['total'] = time.perf_counter() - started
+                self.remove_hooks()
+                self.report(script)
+
+
+def _start_profiler(path):
+    """pyinstrument for .html output when it is installed, cProfile otherwise"""
+    if path.endswith('.html'):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("⚠️ pyinstrument is not installed; writing cProfile stats instead", file=sys.stderr)
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler, path):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        profiler.dump_stats(path)
+    else:
+        profiler.stop()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+    print(f"🧪 Profile written to {path}", file=sys.stderr)
+
+
+def add_arguments(parser):
+    """--stats/--profile options for scripts with an argument parser"""
+    parser.add_argument('--stats', nargs='?', const='1', metavar='JSON',
+                        help=f"print stage timers and counters, optionally also as JSON (or set {STATS_ENV})")
+    parser.add_argument('--profile', metavar='FILE',
+                        help=f"write a cProfile dump, or pyinstrument HTML for .html (or set {PROFILE_ENV})")
+
+
+def configure(args):
+    """Apply parsed --stats/--profile options"""
+    STATS.configure(args.stats, args.profile)
+
+
+STATS = Instrumentation()
+STATS.configure(os.environ.get(STATS_ENV), os.environ.get(PROFILE_ENV))
@@ -4,54 +4,138 @@ Internal Duplicate Scanner for Current Catalog
 Identifies duplicates within the existing 1091 initiatives
 """
 
-import re
-from difflib import SequenceMatcher
-from collections import defaultdict
+import argparse
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+
+from candidate_index import CandidateIndex
+from clustering import cluster_pairs, split_cluster
+import instrumentation
+import score_cache
+from instrumentation import STATS
+from keyword_matrix import KeywordMatrix
+from scan_state import ScanState, record_key, state_path
+from score_cache import SEQUENCE_RATIO, ScoreCache
+from theme_tagger import ThemeTagger
+from text_features import BASE_STOPWORDS, CATALOG_PREFIX, CATALOG_SUFFIX, FeatureStore, NormalizationProfile, keyword_jaccard
+from tfidf_scorer import TfidfModel, top_k_neighbours
+
+PROFILE = NormalizationProfile(
+    CATALOG_PREFIX, CATALOG_SUFFIX,
+    BASE_STOPWORDS | {'poor', 'rich', 'family', 'families', 'children', 'people'}
+)
+FEATURES = FeatureStore(PROFILE)
+
+# Similarity at which a pair is a duplicate whatever its keywords, and the
+# keyword overlap at which it is one whatever its similarity
+MATCH_SIMILARITY = 0.75
+MATCH_KEYWORDS = 0.7
 
 def normalize_text(text):
     """Normalize text for comparison"""
-    text = text.lower()
-    text = re.sub(r'\s+', ' ', text)
-    # Remove common prefixes/suffixes
-    text = re.sub(r'^(to |platform to |app to |initiative to |create |provide |support |distribute |sponsor |fund |organize |build |install |set up |establish )', '', text)
-    text = re.sub(r'(platform|app|initiative|program|system|network|bank|support|hub|tracker|fund|leaderboard)$', '', text)
-    text = text.strip()
-    return text
+    return FEATURES.get(text).normalized
 
 def similarity_score(a, b):
     """Calculate similarity between two strings"""
-    return SequenceMatcher(None, normalize_text(a), normalize_text(b)).ratio()
+    return FEATURES.scorer(b).ratio(FEATURES.get(a).normalized)
 
 def extract_keywords(text):
     """Extract key concepts from text"""
-    normalized = normalize_text(text)
-    keywords = set()
-    
-    # Add important terms
-    for word in normalized.split():
-        if len(word) > 3 and word not in ['with', 'from', 'this', 'that', 'will', 'have', 'been', 'they', 'them', 'their', 'these', 'those', 'poor', 'rich', 'family', 'families', 'children', 'people']:
-            keywords.add(word)
-    
-    return keywords
+    return FEATURES.get(text).keywords
 
 def keyword_overlap(text1, text2):
     """Calculate keyword overlap between two texts"""
-    keywords1 = extract_keywords(text1)
-    keywords2 = extract_keywords(text2)
+    return keyword_jaccard(FEATURES.get(text1), FEATURES.get(text2))
+
+def is_duplicate(text1, text2, similarity=None):
+    """Match rule for one pair of initiatives; pass similarity when it is already known"""
+    if similarity is None:
+        similarity = similarity_score(text1, text2)
+    # More aggressive duplicate detection
+    return similarity >= MATCH_SIMILARITY or keyword_overlap(text1, text2) >= MATCH_KEYWORDS
+
+def scored_matches(initiatives, pairs, cache=None):
+    """(i, j, True) for each matching pair of a sorted pair list, with similarities from a ScoreCache if given.
+
+    Similarities are bounded at MATCH_SIMILARITY: a pair the length and
+    character bounds rule out comes back as None without a full ratio, is not
+    cached, and can then only match on its keywords.
+    """
+    matches = []
+    # Pairs arrive grouped by i, so each initiative is normalized and looked up once
+    for i, group in groupby(pairs, key=itemgetter(0)):
+        others = [j for _, j in group]
+        normalized = normalize_text(initiatives[i])
+        counts = Counter(normalized)
+        def score(k):
+            return FEATURES.scorer(initiatives[others[k]]).bounded_ratio(normalized, MATCH_SIMILARITY, counts)
+        if cache is None:
+            scores = [score(k) for k in range(len(others))]
+        else:
+            scores = cache.scores(normalized, [normalize_text(initiatives[j]) for j in others], score)
+        matches.extend(
+            (i, j, True) for j, similarity in zip(others, scores)
+            if is_duplicate(initiatives[i], initiatives[j], similarity or 0.0)
+        )
+    return matches
+
+def tfidf_matches(initiatives, k=10):
+    """Duplicate pairs: each initiative's k nearest TF-IDF neighbours by cosine, and every keyword match.
+
+    The keyword side sweeps all pairs through the catalog's KeywordMatrix,
+    so a keyword match outside an initiative's nearest neighbours is kept.
+    """
+    features = FEATURES.build(initiatives)
+    normalized = [record.normalized for record in features]
+    vectors = TfidfModel().fit(normalized).transform(normalized)
     
-    if not keywords1 or not keywords2:
-        return 0
+    pairs = set()
+    STATS.add('pairs_considered', len(initiatives) * (len(initiatives) - 1) // 2)
+    for i, row in enumerate(top_k_neighbours(vectors, k=k)):
+        STATS.add('cosine_pairs', len(row))
+        for j, cosine in row:
+            if cosine >= MATCH_SIMILARITY:
+                pairs.add((min(i, j), max(i, j)))
+    cosine_matches = len(pairs)
+    pairs.update((i, j) for i, j, _ in KeywordMatrix(features).pairs(MATCH_KEYWORDS))
     
-    intersection = len(keywords1.intersection(keywords2))
-    union = len(keywords1.union(keywords2))
+    print(f"TF-IDF neighbour pairs: up to {k} per initiative, {cosine_matches} matching")
+    print(f"Keyword matches across all pairs: {len(pairs) - cosine_matches} more")
+    print()
+    return [(i, j, True) for i, j in sorted(pairs)]
+
+def incremental_matches(initiatives, index, state, cache=None):
+    """Matches of the whole catalog, scoring only pairs that involve new or changed initiatives.
+
+    The candidate index itself is not kept between runs: it is keyed by
+    catalog position and picks each record's rarest n-grams and keywords by
+    catalog-wide frequency, so any edit can change every record's postings.
+    It is rebuilt from the normalized text the state keeps.
+    """
+    keys = [record_key(text) for text in initiatives]
+    changed = state.changed(keys)
+    pairs = sorted(index.candidate_pairs(only=changed))
+    print(f"Changed initiatives: {len(changed)} of {len(initiatives)}")
+    print(f"Candidate pairs scored: {len(pairs)}")
+    STATS.add('pairs_considered', len(pairs))
+    print()
     
-    return intersection / union if union > 0 else 0
+    matches = state.known_matches(keys, changed)
+    matches.extend(scored_matches(initiatives, pairs, cache))
+    
+    features = {key: FEATURES.get(text).normalized for key, text in zip(keys, initiatives)}
+    state.update(keys, matches, features=features)
+    state.save()
+    return matches
 
-def find_internal_duplicates():
+def find_internal_duplicates(incremental=False, scorer='sequence', cache=None, tagger=None,
+                             path='/workspace/current_initiatives.txt'):
     """Find duplicates within current catalog"""
     
     # Read current initiatives
-    with open('/workspace/current_initiatives.txt', 'r') as f:
+    STATS.lap('read catalog')
+    with open(path, 'r') as f:
         initiatives = [line.strip() for line in f if line.strip()]
     
     print(f"🔍 INTERNAL DUPLICATE ANALYSIS")
@@ -59,34 +143,59 @@ def find_internal_duplicates():
     print(f"Scanning {len(initiatives)} initiatives for internal duplicates...")
     print()
     
-    # Find duplicates
-    duplicates = []
-    processed = set()
+    state = None
+    if incremental:
+        # Reuse the normalized text kept from the previous scan
+        state = ScanState('internal', {'similarity': MATCH_SIMILARITY, 'keywords': MATCH_KEYWORDS})
+        for text in initiatives:
+            FEATURES.get(text, state.features.get(record_key(text)))
     
-    for i, init1 in enumerate(initiatives):
-        if i in processed:
-            continue
-            
-        similar_group = [(i, init1)]
+    STATS.lap('scoring')
+    if scorer == 'tfidf':
+        matches = tfidf_matches(initiatives)
+    else:
+        # Block the catalog so only plausible pairs get the exact scoring
+        features = FEATURES.build(initiatives)
+        index = CandidateIndex(jaccard_threshold=MATCH_KEYWORDS).build(
+            [record.normalized for record in features],
+            [record.keywords for record in features]
+        )
         
-        for j, init2 in enumerate(initiatives[i+1:], i+1):
-            if j in processed:
-                continue
-                
-            similarity = similarity_score(init1, init2)
-            keyword_sim = keyword_overlap(init1, init2)
-            
-            # More aggressive duplicate detection
-            if similarity >= 0.75 or keyword_sim >= 0.7:
-                similar_group.append((j, init2))
-                processed.add(j)
+        if state is not None:
+            matches = incremental_matches(initiatives, index, state, cache)
+        else:
+            pairs = sorted(index.candidate_pairs())
+            total_pairs = len(initiatives) * (len(initiatives) - 1) // 2
+            print(f"Candidate pairs: {len(pairs)} of {total_pairs} possible")
+            STATS.add('pairs_considered', len(pairs))
+            STATS.add('pairs_pruned_by_index', total_pairs - len(pairs))
+            print()
+            matches = scored_matches(initiatives, pairs, cache)
         
-        if len(similar_group) > 1:
-            duplicates.append(similar_group)
-            for idx, _ in similar_group:
-                processed.add(idx)
+        if cache is not None:
+            cache.save()
+            print(cache.summary())
+            print()
+    
+    # Matches chain clusters together (A~B and B~C link A and C), so each
+    # cluster is split until every REMOVE matches the entry its group keeps
+    STATS.lap('clustering')
+    matched = {(i, j) for i, j, _ in matches}
+    def matches_representative(a, b):
+        if (min(a, b), max(a, b)) in matched:
+            return True
+        # The candidate index never proposed this pair; score it directly
+        return scorer == 'sequence' and is_duplicate(initiatives[a], initiatives[b])
+    
+    duplicates = []
+    review = []
+    for cluster in cluster_pairs(len(initiatives), matched):
+        groups, unmatched = split_cluster(cluster, matches_representative, key=lambda idx: len(initiatives[idx]))
+        duplicates.extend([(idx, initiatives[idx]) for idx in group] for group in groups)
+        review.extend((idx, initiatives[idx]) for idx in unmatched)
     
     # Display results
+    STATS.lap('report')
     print("🎯 DUPLICATE GROUPS FOUND")
     print("-" * 40)
     
@@ -97,9 +206,7 @@ def find_internal_duplicates():
         print(f"\n📦 GROUP {group_num} ({len(group)} similar initiatives):")
         print("-" * 30)
         
-        # Sort by length (keep the most comprehensive)
-        group.sort(key=lambda x: len(x[1]), reverse=True)
-        
+        # The most comprehensive entry leads the group and is kept
         for i, (idx, text) in enumerate(group):
             status = "✅ KEEP (Most comprehensive)" if i == 0 else f"🗑️ REMOVE (Duplicate {i})"
             print(f"{status}")
@@ -110,36 +217,20 @@ def find_internal_duplicates():
                 total_duplicates += 1
         print()
     
+    if review:
+        print(f"\n🔎 REVIEW ({len(review)} initiatives linked to a group only through other duplicates):")
+        print("-" * 30)
+        for idx, text in review:
+            print(f"   {idx}: {text[:100]}{'...' if len(text) > 100 else ''}")
+        print()
+    
     # Check for theme-based consolidation opportunities
+    STATS.lap('themes')
     print("🔍 THEME-BASED CONSOLIDATION OPPORTUNITIES")
     print("-" * 40)
     
-    themes = {
-        'eye': [],
-        'dental': [],
-        'bicycle': [],
-        'solar': [],
-        'water': [],
-        'housing': [],
-        'education': [],
-        'medical': [],
-        'food': [],
-        'clothing': [],
-        'widow': [],
-        'orphan': [],
-        'sewing': [],
-        'farmers': [],
-        'street vendor': [],
-        'ambulance': [],
-        'toilet': [],
-        'library': []
-    }
-    
-    for i, text in enumerate(initiatives):
-        text_lower = text.lower()
-        for theme in themes:
-            if theme in text_lower:
-                themes[theme].append((i, text))
+    # One automaton pass per initiative tags every theme and synonym at once
+    themes = (tagger or ThemeTagger()).postings(initiatives)
     
     consolidation_opportunities = 0
     for theme, items in themes.items():
@@ -155,6 +246,7 @@ def find_internal_duplicates():
     print("-" * 40)
     print(f"Current initiatives: {len(initiatives)}")
     print(f"Exact/near duplicates found: {total_duplicates}")
+    print(f"Chained matches left for review: {len(review)}")
     print(f"Theme consolidation opportunities: {consolidation_opportunities}")
     print(f"Total potential removals: {total_duplicates + consolidation_opportunities}")
     print(f"Optimized catalog size: {len(initiatives) - total_duplicates - consolidation_opportunities}")
@@ -162,4 +254,24 @@ def find_internal_duplicates():
     return removal_candidates, duplicates, themes
 
 if __name__ == "__main__":
-    removal_candidates, duplicates, themes = find_internal_duplicates()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Internal duplicate scan of the current catalog")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"only score new or changed initiatives against the last scan ({state_path('internal')})")
+    parser.add_argument('--scorer', choices=('sequence', 'tfidf'), default='sequence',
+                        help="SequenceMatcher ratio + keyword overlap, or TF-IDF cosine over words and character 3-grams")
+    parser.add_argument('--themes', metavar='JSON',
+                        help="theme dictionary of {theme: [phrase, ...]} (default: the built-in themes)")
+    score_cache.add_argument(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    if args.incremental and args.scorer != 'sequence':
+        parser.error("--incremental only supports the sequence scorer")
+    if args.score_cache and args.scorer != 'sequence':
+        parser.error("--score-cache only supports the sequence scorer")
+    instrumentation.configure(args)
+    
+    cache = ScoreCache(*SEQUENCE_RATIO, path=args.score_cache) if args.score_cache else None
+    tagger = ThemeTagger.load(args.themes) if args.themes else None
+    removal_candidates, duplicates, themes = STATS.run(
+        'internal_duplicate_scanner', find_internal_duplicates, args.incremental, args.scorer, cache, tagger
+    )
\ No newline at end of file
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Keyword Overlap Matrix
+Keyword bitsets of a whole catalog, so one initiative's keyword overlap with every entry, or every
+pair of entries reaching a cutoff, is computed at once
+"""
+
+from collections import Counter
+
+# With NumPy the bitsets are packed into a uint64 matrix and a row of overlaps
+# is a few vector operations; without it each entry is an int AND and popcount
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Set bits per byte, for NumPy versions without bitwise_count()
+_BYTE_POPCOUNT = None if np is None else np.array([bin(k).count('1') for k in range(256)], dtype=np.uint8)
+
+# Entries per block in pairs(); a block of AND-ed bitsets holds BLOCK_SIZE² x words uint64s
+BLOCK_SIZE = 256
+
+
+def _popcount_rows(words):
+    """Set bits along the last axis of a uint64 array"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_POPCOUNT[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+class KeywordMatrix:
+    """Keyword bitsets of a list of TextFeatures from one FeatureStore.
+
+    overlap() gives the same values as keyword_jaccard() against each entry,
+    and pairs() the entry pairs whose keyword_jaccard() reaches a cutoff.
+    Keywords at least two entries have get a column of their own; a keyword
+    only one entry has is kept as a posting to that entry instead, so the
+    matrix is as wide as the catalog's shared vocabulary, not its whole one.
+    """
+
+    def __init__(self, features):
+        frequency = Counter(token for record in features for token in record.token_ids)
+        self.columns = {}
+        self.singles = {}
+        self.bits = []
+        for row, record in enumerate(features):
+            bits = 0
+            for token in record.token_ids:
+                if frequency[token] == 1:
+                    self.singles[token] = row
+                    continue
+                column = self.columns.get(token)
+                if column is None:
+                    column = self.columns[token] = len(self.columns)
+                bits |= 1 << column
+            self.bits.append(bits)
+        self.counts = [len(record.keywords) for record in features]
+
+        self.packed = None
+        if np is not None and self.bits:
+            self.words = max(1, (len(self.columns) + 63) // 64)
+            self.packed = np.frombuffer(
+                b''.join(bits.to_bytes(self.words * 8, 'little') for bits in self.bits), dtype='<u8'
+            ).reshape(len(self.bits), self.words)
+            self.count_array = np.asarray(self.counts, dtype=np.int64)
+
+    def overlap(self, record):
+        """keyword_jaccard(record, entry) for every entry, in order"""
+        count = len(record.keywords)
+        if not count:
+            return [0] * len(self.bits)
+
+        query = 0
+        single_rows = []
+        for token in record.token_ids:
+            column = self.columns.get(token)
+            if column is not None:
+                query |= 1 << column
+            elif token in self.singles:
+                single_rows.append(self.singles[token])
+        if self.packed is not None:
+            return self._overlap_packed(query, count, single_rows)
+
+        overlaps = []
+        for other, other_count in zip(self.bits, self.counts):
+            if other:
+                shared = (query & other).bit_count()
+                overlaps.append(shared / (count + other_count - shared))
+            else:
+                overlaps.append(0)
+        # Entries holding one of the query's unshared keywords get it added on top
+        for row, extra in Counter(single_rows).items():
+            shared = (query & self.bits[row]).bit_count() + extra
+            overlaps[row] = shared / (count + self.counts[row] - shared)
+        return overlaps
+
+    def _overlap_packed(self, query, count, single_rows):
+        query = np.frombuffer(query.to_bytes(self.words * 8, 'little'), dtype='<u8')
+        shared = _popcount_rows(self.packed & query)
+        if single_rows:
+            np.add.at(shared, single_rows, 1)
+        overlaps = shared / (count + self.count_array - shared)
+        overlaps[self.count_array == 0] = 0
+        return overlaps.tolist()
+
+    def pairs(self, cutoff, block_size=BLOCK_SIZE):
+        """(i, j, overlap) for every pair of entries, i < j, whose keyword overlap reaches cutoff (above 0).
+
+        Two entries can only share keywords that have a column, so the
+        overlap of a pair is the popcount of their ANDed bitsets over the sum
+        of their keyword counts less that. With NumPy the catalog is cut into
+        row blocks and each block is ANDed against itself and every later one.
+        """
+        if self.packed is not None:
+            return self._pairs_packed(cutoff, block_size)
+
+        pairs = []
+        for i, (bits, count) in enumerate(zip(self.bits, self.counts)):
+            if not bits:
+                continue
+            for j in range(i + 1, len(self.bits)):
+                shared = (bits & self.bits[j]).bit_count()
+                if shared:
+                    overlap = shared / (count + self.counts[j] - shared)
+                    if overlap >= cutoff:
+                        pairs.append((i, j, overlap))
+        return pairs
+
+    def _pairs_packed(self, cutoff, block_size):
+        pairs = []
+        size = len(self.bits)
+        for start in range(0, size, block_size):
+            rows = self.packed[start:start + block_size]
+            row_counts = self.count_array[start:start + block_size, None]
+            for other in range(start, size, block_size):
+                shared = _popcount_rows(rows[:, None, :] & self.packed[None, other:other + block_size, :])
+                overlaps = shared / np.maximum(row_counts + self.count_array[None, other:other + block_size] - shared, 1)
+                hits = (shared > 0) & (overlaps >= cutoff)
+                if other == start:
+                    # Within one block only the pairs above the diagonal are new
+                    hits = np.triu(hits, 1)
+                i, j = np.nonzero(hits)
+                pairs.extend(zip((i + start).tolist(), (j + other).tolist(), overlaps[i, j].tolist()))
+        pairs.sort()
+        return pairs
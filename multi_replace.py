@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Multi-Pattern Replacement
+Applies every literal fix and cleanup regex to a file in one left-to-right pass, counting hits per rule
+"""
+
+import re
+
+
+def _trie_pattern(literals):
+    """Regex matching any of the literals, factored into a trie so each position costs one walk down it.
+
+    Shared prefixes are matched once and every branch point only tests the
+    next character, so the cost does not grow with the number of literals.
+    Optional tails are greedy, so the longest literal at a position wins.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[None] = True
+
+    # Post-order over an explicit stack: fixes can be longer than the recursion limit
+    patterns = {}
+    stack = [(trie, False)]
+    while stack:
+        node, expanded = stack.pop()
+        children = [(char, child) for char, child in node.items() if char is not None]
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for _, child in children)
+            continue
+        branches = [re.escape(char) + patterns.pop(id(child)) for char, child in sorted(children)]
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})" if branches else ''
+        patterns[id(node)] = f'(?:{body})?' if None in node and body else body
+    return patterns[id(trie)]
+
+
+class Rewriter:
+    """Literal and regex rewrite rules compiled into one scanner.
+
+    Text is scanned once: at each position the longest literal match wins,
+    then the regex rules in their given order, and replaced text is never
+    scanned again. Regex replacements are literal strings or callables taking
+    the match, since group numbers shift inside the combined pattern.
+    """
+
+    def __init__(self, literals=(), patterns=()):
+        self.rules = [old for old, _ in literals] + [pattern for pattern, _ in patterns]
+        self.replacements = [new for _, new in literals] + [new for _, new in patterns]
+        # A repeated literal keeps its first replacement, as sequential str.replace() did
+        self.literals = {}
+        for k, (old, _) in enumerate(literals):
+            if old:
+                self.literals.setdefault(old, k)
+
+        parts = []
+        if self.literals:
+            parts.append(f'(?P<literal>{_trie_pattern(self.literals)})')
+        parts.extend(f'(?P<rule{k}>{pattern})' for k, (pattern, _) in enumerate(patterns, len(literals)))
+        self.regex = re.compile('|'.join(parts)) if parts else None
+
+    def apply(self, text):
+        """(rewritten text, hits per rule in rule order)"""
+        hits = [0] * len(self.rules)
+        if self.regex is None:
+            return text, hits
+
+        def replace(match):
+            if match.lastgroup == 'literal':
+                k = self.literals[match.group()]
+            else:
+                k = int(match.lastgroup[4:])
+            hits[k] += 1
+            replacement = self.replacements[k]
+            return replacement(match) if callable(replacement) else replacement
+
+        return self.regex.sub(replace, text), hits
+
+
+# Empty array elements left behind by removals: ", ," collapses to one comma
+# and a trailing comma before "]" is dropped, however many commas are in a row
+JSON_CLEANUP = [
+    (r',(?:\s*,)*\s*\]', ']'),
+    (r',(?:\s*,)+', ','),
+]
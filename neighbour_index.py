@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Nearest-Neighbour Index for the Current Catalog
+Built once and saved as memory-mapped arrays, then queried for the top-k closest initiatives to any text
+"""
+
+import argparse
+import heapq
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from collections import defaultdict
+
+from html_patcher import write_atomically
+from text_features import CATALOG_PROFILE, NormalizationProfile
+from tfidf_scorer import TfidfModel
+
+INDEX_VERSION = 2
+INDEX_DIR = '/workspace/neighbour_index'
+
+# Nearest catalog entries the comparison scripts score per original with --neighbours
+NEIGHBOURS_K = 10
+
+# Term-major postings: rows and weights of term t live in [offsets[t], offsets[t + 1])
+ARRAYS = {'offsets': 'I', 'rows': 'I', 'weights': 'f'}
+
+
+def _profile_rules(profile):
+    """JSON-ready normalization rules, as saved in the header"""
+    return [profile.prefix_re.pattern, profile.suffix_re.pattern, sorted(profile.stopwords)]
+
+
+def _map_array(path, typecode):
+    """Read-only view of a binary array file, paged in by the OS on demand"""
+    if os.path.getsize(path) == 0:
+        return memoryview(array(typecode))
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode)
+
+
+class NeighbourIndex:
+    """TF-IDF vectors of a catalog, stored by term so a query only touches rows it shares a term with"""
+
+    def __init__(self, texts, model, profile, offsets, rows, weights):
+        self.texts = texts
+        self.model = model
+        self.profile = profile
+        self.offsets = offsets
+        self.rows = rows
+        self.weights = weights
+
+    @classmethod
+    def build(cls, texts, profile=CATALOG_PROFILE):
+        """Index a list of catalog texts"""
+        normalized = [profile.normalize(text) for text in texts]
+        model = TfidfModel().fit(normalized)
+
+        postings = defaultdict(list)
+        for row, text in enumerate(normalized):
+            for term_id, weight in model.vector(text).items():
+                postings[term_id].append((row, weight))
+
+        offsets, rows, weights = array('I', [0]), array('I'), array('f')
+        for term_id in range(len(model.vocabulary)):
+            for row, weight in postings[term_id]:
+                rows.append(row)
+                weights.append(weight)
+            offsets.append(len(rows))
+        return cls(texts, model, profile, offsets, rows, weights)
+
+    def save(self, directory=INDEX_DIR):
+        """Write the arrays as raw binary files and point the JSON header at them.
+
+        Array files are never rewritten in place, since truncating a file a
+        reader has mapped can kill that reader. Each build writes a fresh
+        arrays-* subdirectory, the header is swapped to it atomically, and
+        only then are older builds removed; open mappings outlive the unlink.
+        Run one build at a time per directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        arrays_dir = tempfile.mkdtemp(prefix='arrays-', dir=directory)
+        for name in ARRAYS:
+            with open(os.path.join(arrays_dir, f'{name}.bin'), 'wb') as f:
+                f.write(getattr(self, name))
+                f.flush()
+                os.fsync(f.fileno())
+
+        meta = {
+            'version': INDEX_VERSION,
+            'byteorder': sys.byteorder,
+            'char_ngram': self.model.char_ngram,
+            'terms': sorted(self.model.vocabulary, key=self.model.vocabulary.get),
+            'idf': self.model.idf,
+            'unseen_idf': self.model.unseen_idf,
+            'profile': _profile_rules(self.profile),
+            'texts': self.texts,
+            'arrays': os.path.basename(arrays_dir),
+        }
+        # The header goes last, so a half-written build is never picked up
+        write_atomically(os.path.join(directory, 'index.json'), json.dumps(meta, ensure_ascii=False))
+
+        for entry in os.listdir(directory):
+            if entry.startswith('arrays-') and entry != meta['arrays']:
+                shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory=INDEX_DIR):
+        """Open a saved index; the arrays are memory-mapped rather than read"""
+        # A rebuild can remove the arrays between reading the header and mapping
+        # them; the header it swapped in by then names the new build
+        for attempt in range(3):
+            with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != INDEX_VERSION or meta.get('byteorder') != sys.byteorder:
+                raise ValueError(f"{directory} was built by an incompatible version; rebuild it")
+            arrays_dir = os.path.join(directory, meta['arrays'])
+            try:
+                arrays = {name: _map_array(os.path.join(arrays_dir, f'{name}.bin'), typecode)
+                          for name, typecode in ARRAYS.items()}
+                break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+
+        model = TfidfModel(meta['char_ngram'])
+        model.vocabulary = {term: i for i, term in enumerate(meta['terms'])}
+        model.idf = meta['idf']
+        model.unseen_idf = meta['unseen_idf']
+        profile = NormalizationProfile(*meta['profile'])
+        return cls(meta['texts'], model, profile, **arrays)
+
+    @classmethod
+    def for_catalog(cls, texts, directory=INDEX_DIR, profile=CATALOG_PROFILE):
+        """The index saved in directory when it covers exactly these texts and rules, else a fresh one saved there"""
+        try:
+            index = cls.load(directory)
+        except (FileNotFoundError, ValueError):
+            index = None
+        if index is not None and index.texts == texts and _profile_rules(index.profile) == _profile_rules(profile):
+            return index
+        index = cls.build(texts, profile)
+        index.save(directory)
+        return index
+
+    def query(self, text, k=5, min_score=0.0):
+        """The k catalog entries closest to text, as [(index, text, cosine), ...] best first"""
+        scores = defaultdict(float)
+        offsets, rows, weights = self.offsets, self.rows, self.weights
+        for term_id, weight in self.model.vector(self.profile.normalize(text)).items():
+            for p in range(offsets[term_id], offsets[term_id + 1]):
+                scores[rows[p]] += weight * weights[p]
+
+        # A k-sized heap instead of sorting every scored row; ties go to catalog order
+        best = heapq.nsmallest(k, ((-score, j) for j, score in scores.items() if score >= min_score))
+        return [(j, self.texts[j], -score) for score, j in best]
+
+
+def add_argument(parser):
+    """--neighbours option for scripts that can score against the nearest catalog entries only"""
+    parser.add_argument('--neighbours', metavar='DIR',
+                        help=f"score each original only against its {NEIGHBOURS_K} nearest catalog entries, "
+                             f"from a neighbour index in DIR (built there if missing or stale)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the catalog neighbour index")
+    parser.add_argument('--index-dir', default=INDEX_DIR, help="where the index files live")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="index current_initiatives.txt")
+    build.add_argument('--source', default='/workspace/current_initiatives.txt')
+    query = commands.add_parser('query', help="closest catalog entries to some text")
+    query.add_argument('text')
+    query.add_argument('-k', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.source, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+        NeighbourIndex.build(texts).save(args.index_dir)
+        print(f"✅ Indexed {len(texts)} initiatives in {args.index_dir}")
+    else:
+        for j, text, score in NeighbourIndex.load(args.index_dir).query(args.text, args.k):
+            print(f"{score:.1%}  {j}: {text}")
@@ -4,7 +4,8 @@ Targeted Duplicate Removal Script
 Removes specific duplicates identified in the analysis
 """
 
-import re
+from html_patcher import TextPatch, remove_records, set_total_count, write_atomically
+from initiatives_parser import parse_initiatives
 
 def remove_specific_duplicates():
     """Remove specific duplicate entries"""
@@ -15,44 +16,22 @@ def remove_specific_duplicates():
     print("🎯 REMOVING SPECIFIC DUPLICATES")
     print("=" * 40)
     
-    # Specific duplicates to remove (keep the first, remove the second)
-    duplicates_to_remove = [
-        {
-            'title': 'Quality Seeds Distribution Chain',
-            'keep_description': 'Platform to create supply chain distributing quality seeds',
-            'remove_description': 'Advanced agricultural supply chain platform ensuring distribution of certified high-quality seeds'
-        },
-        {
-            'title': 'Academic Stress',
-            'keep_pattern': 'Academic Stress Reduction Platform',
-            'remove_pattern': 'Academic Stress Management Hub'
-        },
-        {
-            'title': 'Medication',
-            'keep_pattern': 'Medication Side Effects Tracker',
-            'remove_pattern': 'Medication Impact Tracker'
-        }
-    ]
-    
-    removed_count = 0
-    
-    # Remove the second Quality Seeds Distribution Chain entry
-    print("🗑️ Removing duplicate: Quality Seeds Distribution Chain (Advanced version)")
-    pattern1 = r'\s*{\s*title:\s*"Quality Seeds Distribution Chain",\s*description:\s*"Advanced agricultural supply chain platform.*?\n\s*},?\s*'
-    content = re.sub(pattern1, '', content, flags=re.DOTALL)
-    removed_count += 1
-    
-    # Remove Academic Stress Management Hub (keep Academic Stress Reduction Platform)
-    print("🗑️ Removing duplicate: Academic Stress Management Hub")
-    pattern2 = r'\s*{\s*title:\s*"Academic Stress Management Hub",.*?\n\s*},?\s*'
-    content = re.sub(pattern2, '', content, flags=re.DOTALL)
-    removed_count += 1
+    try:
+        parsed = parse_initiatives(content)
+    except ValueError as error:
+        print(f"❌ Could not parse initiatives array: {error}")
+        return None
+    if parsed is None:
+        print("❌ Could not find initiatives array")
+        return None
     
-    # Remove Medication Impact Tracker (keep Medication Side Effects Tracker)
-    print("🗑️ Removing duplicate: Medication Impact Tracker")
-    pattern3 = r'\s*{\s*title:\s*"Medication Impact Tracker",.*?\n\s*},?\s*'
-    content = re.sub(pattern3, '', content, flags=re.DOTALL)
-    removed_count += 1
+    # (title, description prefix, label) of each entry to drop; None matches any description
+    removal_rules = [
+        ("Quality Seeds Distribution Chain", "Advanced agricultural supply chain platform",
+         "duplicate: Quality Seeds Distribution Chain (Advanced version)"),
+        ("Academic Stress Management Hub", None, "duplicate: Academic Stress Management Hub"),
+        ("Medication Impact Tracker", None, "duplicate: Medication Impact Tracker")
+    ]
     
     # Remove other similar pairs mentioned
     similar_removals = [
@@ -62,36 +41,31 @@ def remove_specific_duplicates():
         "Street Vendor First-Aid Kits",
         "Tool Libraries Platform"
     ]
+    removal_rules.extend((title, None, f"similar duplicate: {title}") for title in similar_removals)
     
-    for title in similar_removals:
-        print(f"🗑️ Removing similar duplicate: {title}")
-        pattern = rf'\s*{{\s*title:\s*"{re.escape(title)}",.*?\n\s*}},?\s*'
-        content = re.sub(pattern, '', content, flags=re.DOTALL)
-        removed_count += 1
+    # Collect every removal from the single parse, then patch the file once
+    titles = parsed.by_title()
+    indices_to_remove = []
+    for title, description_prefix, label in removal_rules:
+        print(f"🗑️ Removing {label}")
+        for record in titles.get(title, []):
+            if description_prefix is None or record.description.startswith(description_prefix):
+                indices_to_remove.append(record.index)
     
-    # Clean up any double commas or formatting issues
-    content = re.sub(r',\s*,', ',', content)
-    content = re.sub(r',\s*\]', ']', content)
+    patch = TextPatch(content)
+    removed_count = remove_records(patch, parsed, indices_to_remove)
+    current_count = len(parsed) - removed_count
     
-    # Update the count
-    current_count = len(re.findall(r'title:\s*"', content))
     print(f"\n📊 REMOVAL SUMMARY")
     print("-" * 20)
     print(f"Specific duplicates removed: {removed_count}")
     print(f"New initiative count: {current_count}")
     
-    # Save the cleaned content
-    with open('/workspace/index.html', 'w') as f:
-        f.write(content)
-    
     # Update the stat display
-    updated_content = content.replace(
-        '<span class="stat-number" id="totalCount">1091</span>',
-        f'<span class="stat-number" id="totalCount">{current_count}</span>'
-    )
+    set_total_count(patch, current_count)
     
-    with open('/workspace/index.html', 'w') as f:
-        f.write(updated_content)
+    # Save the cleaned content
+    write_atomically('/workspace/index.html', patch.apply())
     
     print(f"✅ File updated with {current_count} unique initiatives")
     return current_count
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Incremental Scan State
+Remembers what the last duplicate scan established so the next one only scores new or changed records
+"""
+
+import json
+import os
+from collections import Counter, defaultdict
+
+from fingerprints import FIELD_SEPARATOR, fingerprint
+from html_patcher import write_atomically
+
+# Bump when the state layout changes; match rule changes are caught by the rule itself
+SCAN_STATE_VERSION = 2
+
+# Each scanner keeps its state here, as <name>_scan_state.json
+STATE_DIR = '/workspace'
+
+
+def state_path(name, directory=STATE_DIR):
+    """Where the scanner called name keeps its state"""
+    return os.path.join(directory, f'{name}_scan_state.json')
+
+
+def record_key(*fields):
+    """Content key of a record: changes whenever any compared field changes"""
+    return f"{fingerprint(FIELD_SEPARATOR.join(fields)):016x}"
+
+
+class ScanState:
+    """Records a scanner has fully covered and the pairs among them that matched.
+
+    Invariant kept by every scanner: each pair of covered records was scored in
+    some earlier run, so a covered pair missing from matches is a non-match and
+    never needs scoring again. Pair scores are treated as symmetric.
+
+    A key counts once per occurrence, so a second copy of a covered record is
+    still new. features holds optional per-record data a scanner wants to skip
+    recomputing. rule holds the scanner's match parameters (thresholds and the
+    like, as JSON values); state saved under another rule is ignored, so a
+    changed threshold never reuses matches scored with the old one.
+    """
+
+    def __init__(self, name, rule, directory=STATE_DIR):
+        self.path = state_path(name, directory)
+        self.name = name
+        # Round-trip through JSON so tuples compare equal to the saved lists
+        self.rule = json.loads(json.dumps(rule))
+        self.records = Counter()
+        self.matches = {}
+        self.features = {}
+
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except ValueError:
+            return
+        if (data.get('format') != SCAN_STATE_VERSION or data.get('scanner') != name
+                or data.get('rule') != self.rule):
+            return
+
+        self.records = Counter(data.get('records', {}))
+        self.matches = {(a, b): payload for a, b, payload in data.get('matches', [])}
+        self.features = data.get('features', {})
+
+    def changed(self, keys):
+        """Indices of records the previous scan did not cover, in catalog order"""
+        remaining = Counter(self.records)
+        changed = []
+        for i, key in enumerate(keys):
+            if remaining[key] > 0:
+                remaining[key] -= 1
+            else:
+                changed.append(i)
+        return changed
+
+    def known_matches(self, keys, changed):
+        """Previously found (i, j, payload) matches between unchanged records, i < j"""
+        changed = set(changed)
+        positions = defaultdict(list)
+        for i, key in enumerate(keys):
+            if i not in changed:
+                positions[key].append(i)
+
+        known = []
+        for (a, b), payload in self.matches.items():
+            for i in positions.get(a, ()):
+                for j in positions.get(b, ()):
+                    # Copies of one record pair up once, in catalog order
+                    if a != b or i < j:
+                        known.append((min(i, j), max(i, j), payload))
+        known.sort(key=lambda match: (match[0], match[1]))
+        return known
+
+    def update(self, keys, matches, covered=None, features=None):
+        """Replace the state with a finished scan.
+
+        covered lists the indices of keys the scan fully compared (default: all);
+        matches are (i, j, payload) found between them.
+        """
+        covered = set(range(len(keys)) if covered is None else covered)
+        self.records = Counter(keys[i] for i in covered)
+        self.matches = {}
+        for i, j, payload in matches:
+            if i in covered and j in covered:
+                self.matches[tuple(sorted((keys[i], keys[j])))] = payload
+        if features is not None:
+            self.features = features
+
+    def save(self):
+        """Write the state next to the catalog"""
+        data = {
+            'format': SCAN_STATE_VERSION,
+            'scanner': self.name,
+            'rule': self.rule,
+            'records': dict(self.records),
+            'matches': [[a, b, payload] for (a, b), payload in sorted(self.matches.items())],
+            'features': self.features,
+        }
+        write_atomically(self.path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Persistent Pair-Score Cache
+SQLite table of expensive pair scores keyed by content fingerprints, shared by every scanner
+"""
+
+import argparse
+import sqlite3
+
+from fingerprints import fingerprint
+
+CACHE_PATH = '/workspace/pair_scores.sqlite'
+
+# Rows kept across all scorers before the least recently used texts are evicted.
+# Only pairs that get past the scanners' cheap bounds are stored, so a run
+# adds rows in proportion to its candidates rather than to n x m
+MAX_ROWS = 5_000_000
+
+# SequenceMatcher ratio of two normalized texts; bump the version if that ever changes
+SEQUENCE_RATIO = ('sequence_ratio', 1)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scorers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS scores (
+    scorer INTEGER NOT NULL,
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (scorer, a, b)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS anchors (
+    scorer INTEGER NOT NULL,
+    a INTEGER NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (scorer, a)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS anchors_used ON anchors (used);
+'''
+
+
+class ScoreCache:
+    """Scores of text pairs under one scorer version, grouped by the first text.
+
+    A score depends only on the two texts and the scoring function, so rows
+    are keyed by both texts' fingerprints and the scorer name and version:
+    changing a threshold keeps every row, while edited texts or a new scorer
+    version simply miss. Pass the strings the score actually depends on
+    (normalized text, not raw lines) so equal inputs share rows across scripts.
+
+    Lookups fetch every cached score of one text at once, the way one-vs-many
+    scoring asks for them. Pairs the caller rules out cheaply are never
+    stored, only the scores that took real work. Each run touches the texts it looked up, and save()
+    evicts the least recently used ones once the table exceeds max_rows.
+    """
+
+    def __init__(self, scorer, version=1, path=CACHE_PATH, max_rows=MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+        self._keys = {}
+        self._touched = set()
+        self._pending = {}
+
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+        name = f'{scorer}:{version}'
+        self._connection.execute('INSERT OR IGNORE INTO scorers (name) VALUES (?)', (name,))
+        self.scorer = self._connection.execute('SELECT id FROM scorers WHERE name = ?', (name,)).fetchone()[0]
+        self.generation = self._connection.execute('SELECT COALESCE(MAX(used), 0) + 1 FROM anchors').fetchone()[0]
+        self._connection.commit()
+
+    def key(self, text):
+        """Fingerprint of a text, shifted into SQLite's signed 64-bit integer range"""
+        key = self._keys.get(text)
+        if key is None:
+            key = self._keys[text] = fingerprint(text) >> 1
+        return key
+
+    def scores(self, text, others, score):
+        """The score of text against each of others, from the cache where possible.
+
+        score(k) computes the score against others[k]; it is only called for
+        pairs the cache does not have, and those results are stored by save().
+        It may return None for a pair its cheap bounds rule out: the None is
+        passed back and nothing is stored, so the bounds are simply rerun.
+        """
+        key = self.key(text)
+        self._touched.add(key)
+        known = dict(self._connection.execute(
+            'SELECT b, score FROM scores WHERE scorer = ? AND a = ?', (self.scorer, key)
+        ))
+        computed = self._pending.setdefault(key, {})
+        known.update(computed)
+
+        results = []
+        for k, other in enumerate(others):
+            other_key = self.key(other)
+            value = known.get(other_key)
+            if value is None:
+                value = score(k)
+                if value is None:
+                    self.pruned += 1
+                else:
+                    known[other_key] = computed[other_key] = value
+                    self.misses += 1
+            else:
+                self.hits += 1
+            results.append(value)
+        return results
+
+    def save(self):
+        """Write new scores, mark this run's texts as used and evict down to max_rows.
+
+        Everything happens in one short transaction, so scanners sharing the
+        file only ever wait for each other's save.
+        """
+        connection = self._connection
+        connection.executemany(
+            'INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)',
+            ((self.scorer, key, other_key, value)
+             for key, computed in self._pending.items() for other_key, value in computed.items())
+        )
+        connection.executemany(
+            'INSERT OR REPLACE INTO anchors VALUES (?, ?, ?)',
+            ((self.scorer, key, self.generation) for key in self._touched)
+        )
+        excess = connection.execute('SELECT COUNT(*) FROM scores').fetchone()[0] - self.max_rows
+        if excess > 0:
+            stale = connection.execute('SELECT scorer, a FROM anchors ORDER BY used, scorer, a').fetchall()
+            for scorer, key in stale:
+                if excess <= 0:
+                    break
+                excess -= connection.execute('DELETE FROM scores WHERE scorer = ? AND a = ?', (scorer, key)).rowcount
+                connection.execute('DELETE FROM anchors WHERE scorer = ? AND a = ?', (scorer, key))
+        connection.commit()
+        self._pending.clear()
+        self._touched.clear()
+
+    def close(self):
+        self._connection.close()
+
+    def summary(self):
+        """One-line hit/miss report"""
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0
+        return (f"💾 Score cache: {self.hits:,} of {total:,} pair scores cached ({rate:.1%}), {self.misses:,} computed, "
+                f"{self.pruned:,} ruled out by the bounds")
+
+
+def add_argument(parser):
+    """--score-cache option for scanners that can use the cache"""
+    parser.add_argument('--score-cache', nargs='?', const=CACHE_PATH, metavar='PATH',
+                        help=f"reuse pair scores from earlier runs (default {CACHE_PATH})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the pair-score cache")
+    parser.add_argument('--path', default=CACHE_PATH)
+    parser.add_argument('--clear', action='store_true', help="delete every cached score")
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.path, timeout=30)
+    connection.executescript(SCHEMA)
+    if args.clear:
+        connection.executescript('DELETE FROM scores; DELETE FROM anchors; VACUUM;')
+        print(f"🗑️ Cleared {args.path}")
+    rows = connection.execute(
+        'SELECT name, COUNT(a), COUNT(DISTINCT a) FROM scorers LEFT JOIN scores ON scores.scorer = scorers.id '
+        'GROUP BY scorers.id ORDER BY name'
+    ).fetchall()
+    for name, count, texts in rows:
+        print(f"   {name}: {count:,} scores for {texts:,} texts")
+    connection.close()
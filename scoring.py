@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tiered Similarity Scoring
+Skips SequenceMatcher.ratio() whenever cheap upper bounds show a pair cannot reach the cutoff
+"""
+
+import math
+from collections import Counter
+from difflib import SequenceMatcher
+
+
+def _ratio(matches, length):
+    """Same formula SequenceMatcher uses, so bounds compare exactly with ratio()"""
+    return 2.0 * matches / length if length else 1.0
+
+
+def length_bound(a, b):
+    """Upper bound from lengths alone (equal to SequenceMatcher.real_quick_ratio())"""
+    return _ratio(min(len(a), len(b)), len(a) + len(b))
+
+
+def character_bound(a, b, counts_a=None, counts_b=None):
+    """Upper bound from shared characters (equal to SequenceMatcher.quick_ratio()).
+
+    Callers comparing one text many times can pass its Counter in counts_a/counts_b.
+    """
+    counts_a = Counter(a) if counts_a is None else counts_a
+    counts_b = Counter(b) if counts_b is None else counts_b
+    return _ratio(sum((counts_a & counts_b).values()), len(a) + len(b))
+
+
+def above(score):
+    """Smallest cutoff that only lets through scores strictly greater than score"""
+    return math.nextafter(score, math.inf)
+
+
+def bounded_ratio(a, b, cutoff, counts_a=None, counts_b=None, matcher=None):
+    """SequenceMatcher(None, a, b).ratio(), or None when it cannot reach cutoff.
+
+    The bounds are computed directly instead of through real_quick_ratio() and
+    quick_ratio() so that pruned pairs never pay for building a SequenceMatcher.
+    A matcher already holding b as its second sequence is reused when given.
+    """
+    if length_bound(a, b) < cutoff:
+        return None
+    if character_bound(a, b, counts_a, counts_b) < cutoff:
+        return None
+    return _exact_ratio(a, b, matcher)
+
+
+def _exact_ratio(a, b, matcher=None):
+    """The full SequenceMatcher ratio, for pairs the bounds could not rule out"""
+    if matcher is None:
+        return SequenceMatcher(None, a, b).ratio()
+    matcher.set_seq1(a)
+    return matcher.ratio()
+
+
+class SequenceScorer:
+    """SequenceMatcher ratios of many texts against one fixed text.
+
+    SequenceMatcher indexes its second sequence when it is set, and that index
+    is most of the cost of a short comparison. The fixed text is set once with
+    set_seq2() and every scored text only goes through set_seq1(), so
+    scorer.ratio(a) is SequenceMatcher(None, a, fixed).ratio() without the
+    rebuild. Keep one scorer per catalog entry to score a whole list against it.
+    """
+
+    __slots__ = ('fixed', 'counts', 'matcher')
+
+    def __init__(self, fixed):
+        self.fixed = fixed
+        self.counts = Counter(fixed)
+        self.matcher = SequenceMatcher(None)
+        self.matcher.set_seq2(fixed)
+
+    def ratio(self, text):
+        """SequenceMatcher(None, text, fixed).ratio()"""
+        self.matcher.set_seq1(text)
+        return self.matcher.ratio()
+
+    def ratios(self, texts):
+        """Ratios of a whole list of texts against the fixed one, in order"""
+        return [self.ratio(text) for text in texts]
+
+    def bounded_ratio(self, text, cutoff, counts=None):
+        """bounded_ratio(text, fixed, cutoff), reusing the fixed text's index and counts"""
+        return bounded_ratio(text, self.fixed, cutoff, counts, self.counts, self.matcher)
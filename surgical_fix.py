@@ -5,6 +5,8 @@ Surgical fix for specific JavaScript errors only
 
 import re
 
+from multi_replace import JSON_CLEANUP, Rewriter
+
 def surgical_fix():
     """Apply only essential fixes without breaking the structure"""
     
@@ -29,15 +31,14 @@ def surgical_fix():
         (r'// COMMUNITY RENEWABLE ENERGY REVOLUTION// VILLAGE YOUTH INNOVATION ECOSYSTEM// RURAL HEALTH SYSTEM TRANSFORMATION', '// RURAL HEALTH SYSTEM TRANSFORMATION'),
     ]
     
-    # Apply only critical fixes
-    for old, new in critical_fixes:
-        if old in content:
-            content = content.replace(old, new)
-            print(f"✅ Fixed critical comment: {old[:30]}...")
-    
-    # Fix any obvious JSON comma issues
-    content = re.sub(r',\s*,', ',', content)
-    content = re.sub(r',\s*\]', ']', content)
+    # Apply only critical fixes, and fix any obvious JSON comma issues in the same pass
+    content, hits = Rewriter(critical_fixes, JSON_CLEANUP).apply(content)
+    for (old, _), count in zip(critical_fixes, hits):
+        if count:
+            print(f"✅ Fixed critical comment: {old[:30]}... ({count}x)")
+    for (pattern, _), count in zip(JSON_CLEANUP, hits[len(critical_fixes):]):
+        if count:
+            print(f"🧹 Cleaned up {pattern}: {count}x")
     
     # Count after
     after_count = len(re.findall(r'title:\s*"', content))
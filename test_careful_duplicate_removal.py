@@ -0,0 +1,97 @@
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import careful_duplicate_removal
+from initiatives_parser import parse_initiatives
+
+PAGE = '''<html>
+<body>
+    <span class="stat-number" id="totalCount">4</span>
+    <script>
+        const initiatives = [
+            // RURAL WATER GRID
+            {
+                title: "Rural Water Grid",
+                description: "Piped drinking water for every village household",
+                category: "infrastructure",
+                impact: "high",
+                beneficiaries: "Villages",
+                icon: "💧"
+            },
+            // SOLAR SCHOOLS
+            {
+                title: "Solar Schools",
+                description: "Rooftop solar panels powering government schools",
+                category: "energy",
+                impact: "medium",
+                beneficiaries: "Students",
+                icon: "☀️"
+            },
+            // RURAL WATER GRID
+            {
+                title: "Rural Water Grid",
+                description: "Piped drinking water for every village household",
+                category: "infrastructure",
+                impact: "high",
+                beneficiaries: "Villages",
+                icon: "💧"
+            },
+            // MOBILE HEALTH VANS
+            {
+                title: "Mobile Health Vans",
+                description: "Doctors visiting remote districts on a weekly route",
+                category: "health",
+                impact: "high",
+                beneficiaries: "Patients",
+                icon: "🚑"
+            }
+        ];
+
+        let filteredData = initiatives;
+
+        function renderCards() {
+            return filteredData.length;
+        }
+    </script>
+</body>
+</html>
+'''
+
+
+@pytest.fixture
+def page(tmp_path):
+    path = tmp_path / 'index.html'
+    path.write_text(PAGE, encoding='utf-8')
+    return path
+
+
+def test_removal_keeps_page_script_valid(page, tmp_path):
+    assert careful_duplicate_removal.careful_duplicate_removal(
+        path=str(page), backup_path=str(tmp_path / 'index_backup.html'))
+
+    content = page.read_text(encoding='utf-8')
+    parsed = parse_initiatives(content)
+    assert [record.title for record in parsed] == ['Rural Water Grid', 'Solar Schools', 'Mobile Health Vans']
+    assert content.count('let filteredData') == 1
+    assert '<span class="stat-number" id="totalCount">3</span>' in content
+    assert (tmp_path / 'index_backup.html').read_text(encoding='utf-8') == PAGE
+
+    if shutil.which('node') is None:
+        return
+    script = tmp_path / 'page.js'
+    script.write_text('\n'.join(re.findall(r'<script>(.*?)</script>', content, re.DOTALL)), encoding='utf-8')
+    result = subprocess.run(['node', '--check', str(script)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_malformed_array_is_reported_without_a_traceback(tmp_path, capsys):
+    path = tmp_path / 'index.html'
+    path.write_text(PAGE.replace('icon: "☀️"\n            },', 'icon: "☀️"\n            }', 1), encoding='utf-8')
+
+    assert not careful_duplicate_removal.careful_duplicate_removal(
+        path=str(path), backup_path=str(tmp_path / 'index_backup.html'))
+    assert '❌ Could not parse initiatives array' in capsys.readouterr().out
+    assert not (tmp_path / 'index_backup.html').exists()
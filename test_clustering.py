@@ -0,0 +1,62 @@
+import os
+
+import internal_duplicate_scanner
+from candidate_index import CandidateIndex
+from clustering import cluster_pairs, split_cluster
+from score_cache import SEQUENCE_RATIO, ScoreCache
+
+
+def test_chained_member_is_split_off_from_representative():
+    # 0~1 and 1~2 match, 0 and 2 do not; 0 is the longest entry
+    matched = {(0, 1), (1, 2)}
+    lengths = [30, 20, 10]
+    [cluster] = cluster_pairs(3, matched)
+    assert cluster == [0, 1, 2]
+
+    groups, unmatched = split_cluster(cluster, lambda a, b: (min(a, b), max(a, b)) in matched, lengths.__getitem__)
+    assert groups == [[0, 1]]
+    assert unmatched == [2]
+
+
+def test_split_groups_the_rest_around_the_next_representative():
+    matched = {(0, 1), (1, 2), (2, 3)}
+    lengths = [30, 5, 20, 10]
+    groups, unmatched = split_cluster([0, 1, 2, 3], lambda a, b: (min(a, b), max(a, b)) in matched,
+                                      lengths.__getitem__)
+    assert groups == [[0, 1], [2, 3]]
+    assert unmatched == []
+
+
+def test_scanner_only_removes_matches_of_the_kept_entry(tmp_path):
+    a = 'solar lamps for village schools'
+    b = 'solar lamps for village homes'
+    c = 'solar pumps for tribal homes'
+    assert internal_duplicate_scanner.is_duplicate(a, b)
+    assert internal_duplicate_scanner.is_duplicate(b, c)
+    assert not internal_duplicate_scanner.is_duplicate(a, c)
+
+    path = tmp_path / 'initiatives.txt'
+    path.write_text(f'{a}\n{b}\n{c}\n', encoding='utf-8')
+    removal_candidates, duplicates, _ = internal_duplicate_scanner.find_internal_duplicates(path=str(path))
+
+    assert duplicates == [[(0, a), (1, b)]]
+    assert removal_candidates == [(1, b)]
+
+
+def test_cached_and_uncached_scoring_find_the_same_matches(tmp_path):
+    with open(os.path.join(os.path.dirname(__file__), 'current_initiatives.txt'), encoding='utf-8') as f:
+        initiatives = [line.strip() for line in f if line.strip()][:300]
+    features = internal_duplicate_scanner.FEATURES.build(initiatives)
+    index = CandidateIndex(jaccard_threshold=internal_duplicate_scanner.MATCH_KEYWORDS).build(
+        [record.normalized for record in features], [record.keywords for record in features]
+    )
+    pairs = sorted(index.candidate_pairs())
+
+    uncached = internal_duplicate_scanner.scored_matches(initiatives, pairs)
+    assert uncached
+    assert uncached == [(i, j, True) for i, j in pairs
+                        if internal_duplicate_scanner.is_duplicate(initiatives[i], initiatives[j])]
+    for _ in range(2):  # a cold cache, then a warm one
+        cache = ScoreCache(*SEQUENCE_RATIO, path=str(tmp_path / 'scores.sqlite'))
+        assert internal_duplicate_scanner.scored_matches(initiatives, pairs, cache) == uncached
+        cache.save()
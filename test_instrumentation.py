@@ -0,0 +1,38 @@
+from difflib import SequenceMatcher
+
+import initiatives_parser
+from instrumentation import Instrumentation
+
+PAGE = '''
+const initiatives = [
+    { title: "Rural Water Grid", description: "Piped water", icon: "💧" },
+    { title: "Solar Schools", description: "Rooftop solar", icon: "☀️" }
+];
+let filteredData = initiatives;
+'''
+
+
+def test_parse_time_is_recorded_as_a_hot_path():
+    stats = Instrumentation()
+    stats.configure(stats=True)
+
+    parsed = stats.run('parse', initiatives_parser.parse_initiatives, PAGE)
+
+    assert len(parsed) == 2
+    summary = stats.summary()
+    assert 'initiatives parsing' in summary['hot_paths']
+    assert summary['counters']['regex_scans'] > 0
+
+
+def test_run_restores_the_patched_hot_paths():
+    ratio = SequenceMatcher.ratio
+    tokens = initiatives_parser._tokens
+    stats = Instrumentation()
+    stats.configure(stats=True)
+    assert SequenceMatcher.ratio is not ratio
+
+    stats.run('ratio', lambda: SequenceMatcher(None, 'solar', 'polar').ratio())
+
+    assert stats.summary()['counters']['ratio_calls'] == 1
+    assert SequenceMatcher.ratio is ratio
+    assert initiatives_parser._tokens is tokens
@@ -0,0 +1,32 @@
+from itertools import combinations
+
+import pytest
+
+import keyword_matrix
+from keyword_matrix import KeywordMatrix
+from text_features import CATALOG_PROFILE, FeatureStore, keyword_jaccard
+
+TEXTS = [
+    'Village solar lamps for rural schools',
+    'Solar lamps for rural village schools and clinics',
+    'Rural water grid for village households',
+    'Village water grid for rural households',
+    'Sewing machine training for unemployed women',
+    'Village solar lamps for rural schools',
+    'Mobile health vans',
+]
+
+
+@pytest.mark.parametrize('packed', [True, False])
+def test_pairs_match_keyword_jaccard_of_every_pair(monkeypatch, packed):
+    if not packed:
+        monkeypatch.setattr(keyword_matrix, 'np', None)
+    elif keyword_matrix.np is None:
+        pytest.skip("NumPy is not installed")
+    features = FeatureStore(CATALOG_PROFILE).build(TEXTS)
+
+    expected = [(i, j, keyword_jaccard(features[i], features[j])) for i, j in combinations(range(len(TEXTS)), 2)]
+    expected = [pair for pair in expected if pair[2] >= 0.5]
+
+    assert expected
+    assert KeywordMatrix(features).pairs(0.5, block_size=3) == expected
@@ -0,0 +1,35 @@
+import comprehensive_analysis
+from neighbour_index import NeighbourIndex
+
+CURRENT = [
+    'Solar lamps for village schools',
+    'Mobile health vans for remote districts',
+    'Rural water grid for every household',
+    'Sewing machine training for unemployed women',
+]
+ORIGINALS = [
+    'Provide solar lamps for village schools',
+    'Rural water grid for households',
+    'Sponsor bus trips for picnics',
+]
+
+
+def test_for_catalog_reuses_the_saved_index_until_the_catalog_changes(tmp_path):
+    directory = str(tmp_path / 'neighbours')
+    NeighbourIndex.for_catalog(CURRENT, directory)
+    header = (tmp_path / 'neighbours' / 'index.json').stat().st_mtime_ns
+
+    assert NeighbourIndex.for_catalog(CURRENT, directory).texts == CURRENT
+    assert (tmp_path / 'neighbours' / 'index.json').stat().st_mtime_ns == header
+
+    assert NeighbourIndex.for_catalog(CURRENT[:-1], directory).texts == CURRENT[:-1]
+
+
+def test_neighbour_scoring_finds_the_full_scan_matches(tmp_path):
+    index = NeighbourIndex.for_catalog(CURRENT, str(tmp_path / 'neighbours'), comprehensive_analysis.PROFILE)
+
+    full = comprehensive_analysis.score_originals(ORIGINALS, CURRENT)
+    nearest = comprehensive_analysis.score_originals(ORIGINALS, CURRENT, neighbours=index)
+
+    assert nearest == full
+    assert [match and match[0] for match in full] == [0, 2, None]
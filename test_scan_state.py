@@ -0,0 +1,16 @@
+from scan_state import ScanState, record_key
+
+
+def test_state_is_reused_only_under_the_same_match_rule(tmp_path):
+    keys = [record_key('solar lamps'), record_key('water grid')]
+    state = ScanState('internal', {'similarity': 0.75, 'keywords': 0.7}, str(tmp_path))
+    state.update(keys, [(0, 1, True)])
+    state.save()
+    assert (tmp_path / 'internal_scan_state.json').exists()
+
+    same = ScanState('internal', {'similarity': 0.75, 'keywords': 0.7}, str(tmp_path))
+    assert same.changed(keys) == []
+    assert same.known_matches(keys, []) == [(0, 1, True)]
+
+    stricter = ScanState('internal', {'similarity': 0.8, 'keywords': 0.7}, str(tmp_path))
+    assert stricter.changed(keys) == [0, 1]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Shared Text Features for Duplicate Scanners
+Normalizes each initiative once and caches the result for every comparison
+"""
+
+import re
+from array import array
+
+from scoring import SequenceScorer
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Words too common to say anything about an initiative
+BASE_STOPWORDS = frozenset([
+    'with', 'from', 'this', 'that', 'will', 'have', 'been', 'they', 'them', 'their', 'these', 'those'
+])
+
+
+class NormalizationProfile:
+    """Precompiled normalization rules for one scanner"""
+
+    __slots__ = ('prefix_re', 'suffix_re', 'stopwords')
+
+    def __init__(self, prefix_pattern, suffix_pattern, stopwords=BASE_STOPWORDS):
+        self.prefix_re = re.compile(prefix_pattern)
+        self.suffix_re = re.compile(suffix_pattern)
+        self.stopwords = frozenset(stopwords)
+
+    def normalize(self, text):
+        """Lowercase, collapse whitespace and strip common prefixes/suffixes"""
+        text = WHITESPACE_RE.sub(' ', text.lower())
+        text = self.prefix_re.sub('', text)
+        text = self.suffix_re.sub('', text)
+        return text.strip()
+
+    def keywords(self, normalized):
+        """Important terms of an already normalized text"""
+        return frozenset(
+            word for word in normalized.split()
+            if len(word) > 3 and word not in self.stopwords
+        )
+
+
+# Action-verb prefixes and generic-noun suffixes the catalog scanners strip
+CATALOG_PREFIX = r'^(to |platform to |app to |initiative to |create |provide |support |distribute |sponsor |fund |organize |build |install |set up |establish )'
+CATALOG_SUFFIX = r'(platform|app|initiative|program|system|network|bank|support|hub|tracker|fund|leaderboard)$'
+CATALOG_PROFILE = NormalizationProfile(CATALOG_PREFIX, CATALOG_SUFFIX)
+
+
+class TextFeatures:
+    """Precomputed comparison features of one initiative"""
+
+    __slots__ = ('text', 'normalized', 'keywords', 'token_ids', 'keyword_bits', 'length', 'scorer')
+
+    def __init__(self, text, normalized, keywords, token_ids):
+        self.text = text
+        self.normalized = normalized
+        self.keywords = keywords
+        self.token_ids = token_ids
+        # One bit per keyword shared with another text, set by the FeatureStore
+        self.keyword_bits = 0
+        self.length = len(normalized)
+        self.scorer = None
+
+
+def keyword_jaccard(a, b):
+    """Jaccard overlap of two TextFeatures from one FeatureStore, or 0 if they share no keyword"""
+    if a is b:
+        # Equal texts share one TextFeatures, whose unshared keywords have no bits
+        return 1.0 if a.keywords else 0
+    if not a.keyword_bits or not b.keyword_bits:
+        return 0
+    shared = (a.keyword_bits & b.keyword_bits).bit_count()
+    return shared / (len(a.keywords) + len(b.keywords) - shared)
+
+
+class FeatureStore:
+    """Computes features once per distinct text and shares one keyword vocabulary.
+
+    Only keywords found in two or more texts get a keyword bit, numbered
+    densely as they become shared: a keyword one text alone has can never be
+    in an intersection, so the bitsets stay as wide as the shared vocabulary
+    rather than the whole one. The first text with a keyword gets its bit
+    when a second text turns up with it.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.vocabulary = {}
+        self.shared_bits = {}
+        self._owners = {}
+        self._cache = {}
+
+    def token_id(self, word):
+        """Integer ID of a keyword, assigned on first sight"""
+        token = self.vocabulary.get(word)
+        if token is None:
+            token = self.vocabulary[word] = len(self.vocabulary)
+        return token
+
+    def _share_keywords(self, features):
+        """Set the bits of the keywords features has in common with earlier texts"""
+        for token in features.token_ids:
+            bit = self.shared_bits.get(token)
+            if bit is None:
+                owner = self._owners.pop(token, None)
+                if owner is None:
+                    self._owners[token] = features
+                    continue
+                bit = self.shared_bits[token] = len(self.shared_bits)
+                owner.keyword_bits |= 1 << bit
+            features.keyword_bits |= 1 << bit
+
+    def get(self, text, normalized=None):
+        """Features of a text, computed on first request.
+
+        Callers that kept the normalized form from an earlier run can pass it
+        to skip normalizing again.
+        """
+        features = self._cache.get(text)
+        if features is None:
+            if normalized is None:
+                normalized = self.profile.normalize(text)
+            keywords = self.profile.keywords(normalized)
+            token_ids = array('I', sorted(self.token_id(word) for word in keywords))
+            features = self._cache[text] = TextFeatures(text, normalized, keywords, token_ids)
+            self._share_keywords(features)
+        return features
+
+    def scorer(self, text):
+        """SequenceScorer with the normalized text as its fixed side, built on first request"""
+        features = self.get(text)
+        if features.scorer is None:
+            features.scorer = SequenceScorer(features.normalized)
+        return features.scorer
+
+    def build(self, texts):
+        """Features for a whole list of texts, in order"""
+        return [self.get(text) for text in texts]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+TF-IDF Similarity Scorer
+Cosine similarity over word and character 3-gram TF-IDF vectors, keeping the top-k neighbours per initiative
+"""
+
+import heapq
+import math
+from collections import Counter, defaultdict
+
+# With NumPy/SciPy, whole-catalog scoring is a few blocked sparse matrix
+# products, so the per-pair work runs in compiled code and memory stays bounded
+# by one block. Without them the same scores come from a pure-Python inverted
+# index, which is exact but much slower on large catalogs
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+# Query rows multiplied per block; bounds the dense score block to block_size x catalog
+BLOCK_SIZE = 512
+
+
+def text_terms(normalized, char_ngram=3):
+    """Word and padded character n-gram terms of an already normalized text"""
+    terms = [f'w:{word}' for word in normalized.split()]
+    padded = f' {normalized} '
+    terms.extend(f'c:{padded[k:k + char_ngram]}' for k in range(len(padded) - char_ngram + 1))
+    return terms
+
+
+class TfidfModel:
+    """Vocabulary and IDF weights fitted on a set of normalized texts.
+
+    Vectors are L2-normalized, so a dot product is the cosine similarity.
+    Terms never seen while fitting get the highest IDF and count towards a
+    vector's norm, but can match nothing.
+    """
+
+    def __init__(self, char_ngram=3):
+        self.char_ngram = char_ngram
+        self.vocabulary = {}
+        self.idf = []
+        self.unseen_idf = 1.0
+
+    def fit(self, texts):
+        """Learn the vocabulary and IDF weights of normalized texts"""
+        frequency = Counter()
+        for text in texts:
+            frequency.update(set(text_terms(text, self.char_ngram)))
+
+        count = len(texts)
+        self.vocabulary = {term: i for i, term in enumerate(sorted(frequency))}
+        self.idf = [math.log((1 + count) / (1 + frequency[term])) + 1 for term in sorted(frequency)]
+        self.unseen_idf = math.log(1 + count) + 1
+        return self
+
+    def vector(self, text):
+        """Sparse {term id: weight} vector of one normalized text"""
+        weights = {}
+        norm = 0.0
+        for term, count in Counter(text_terms(text, self.char_ngram)).items():
+            term_id = self.vocabulary.get(term)
+            idf = self.unseen_idf if term_id is None else self.idf[term_id]
+            weight = (1 + math.log(count)) * idf
+            norm += weight * weight
+            if term_id is not None:
+                weights[term_id] = weight
+
+        norm = math.sqrt(norm)
+        return {term_id: weight / norm for term_id, weight in weights.items()} if norm else {}
+
+    def transform(self, texts):
+        """Vectors of many normalized texts: a CSR matrix with SciPy, else a list of dicts"""
+        vectors = [self.vector(text) for text in texts]
+        if sparse is None:
+            return vectors
+
+        indptr = [0]
+        indices = []
+        data = []
+        for vector in vectors:
+            indices.extend(vector)
+            data.extend(vector.values())
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(vectors), len(self.vocabulary))
+        )
+
+
+def _top_k_dense(scores, k, min_score, exclude):
+    """Top-k (column, score) pairs of one row of scores, best first"""
+    if k <= 0:
+        return []
+    if exclude is not None:
+        scores[exclude] = -1.0
+    if k < len(scores):
+        # Every column tied with the k-th best is a candidate, so the cut below
+        # keeps the lowest columns among ties, as the pure-Python path does
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        columns = np.flatnonzero(scores >= kth)
+    else:
+        columns = np.arange(len(scores))
+    # Best score first, ties in catalog order
+    columns = columns[np.lexsort((columns, -scores[columns]))][:k]
+    return [(int(j), float(scores[j])) for j in columns if scores[j] >= min_score and scores[j] > 0]
+
+
+def _top_k_sparse(queries, catalog, k, min_score, exclude_self, block_size):
+    """Blocked sparse products: each block of query rows is scored against the whole catalog"""
+    catalog_t = catalog.T.tocsr()
+    neighbours = []
+    for start in range(0, queries.shape[0], block_size):
+        block = (queries[start:start + block_size] @ catalog_t).toarray()
+        for offset, scores in enumerate(block):
+            row = start + offset
+            neighbours.append(_top_k_dense(scores, k, min_score, row if exclude_self else None))
+    return neighbours
+
+
+def _top_k_python(queries, catalog, k, min_score, exclude_self):
+    """Inverted-index scoring: only catalog entries sharing a term are touched"""
+    postings = defaultdict(list)
+    for j, vector in enumerate(catalog):
+        for term_id, weight in vector.items():
+            postings[term_id].append((j, weight))
+
+    neighbours = []
+    for row, vector in enumerate(queries):
+        scores = defaultdict(float)
+        for term_id, weight in vector.items():
+            for j, other in postings.get(term_id, ()):
+                scores[j] += weight * other
+        if exclude_self:
+            scores.pop(row, None)
+        best = heapq.nsmallest(k, ((-score, j) for j, score in scores.items() if score >= min_score))
+        neighbours.append([(j, -score) for score, j in best])
+    return neighbours
+
+
+def top_k_neighbours(queries, catalog=None, k=5, min_score=0.0, block_size=BLOCK_SIZE):
+    """The k most similar catalog rows for every query row, as [(index, cosine), ...] best first.
+
+    queries and catalog come from the same TfidfModel.transform(). Without a
+    catalog the queries are compared with each other, excluding themselves.
+    """
+    exclude_self = catalog is None
+    if catalog is None:
+        catalog = queries
+    if sparse is not None:
+        return _top_k_sparse(queries, catalog, k, min_score, exclude_self, block_size)
+    return _top_k_python(queries, catalog, k, min_score, exclude_self)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Theme Tagger for Initiatives
+Aho-Corasick matching of a whole theme dictionary in one pass over each initiative's words
+"""
+
+import json
+import re
+from collections import deque
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Theme -> phrases that tag it; the singular/plural and compound forms are the
+# ones the old substring check picked up in the catalog
+DEFAULT_THEMES = {
+    'eye': ['eye', 'eyes'],
+    'dental': ['dental'],
+    'bicycle': ['bicycle', 'bicycles'],
+    'solar': ['solar'],
+    'water': ['water', 'rainwater', 'watershed'],
+    'housing': ['housing'],
+    'education': ['education', 'educational'],
+    'medical': ['medical'],
+    'food': ['food', 'foods'],
+    'clothing': ['clothing'],
+    'widow': ['widow', 'widows'],
+    'orphan': ['orphan', 'orphans', 'orphanage', 'orphanages'],
+    'sewing': ['sewing'],
+    'farmers': ['farmers'],
+    'street vendor': ['street vendor', 'street vendors'],
+    'ambulance': ['ambulance', 'ambulances'],
+    'toilet': ['toilet', 'toilets'],
+    'library': ['library'],
+}
+
+
+def words(text):
+    """Lowercase word tokens; punctuation and hyphens separate words"""
+    return WORD_RE.findall(text.lower())
+
+
+class ThemeTagger:
+    """Aho-Corasick automaton over word tokens.
+
+    Phrases are sequences of whole words, so every match starts and ends on a
+    word boundary, and tagging a text costs one step per word however many
+    themes and synonyms the dictionary holds.
+    """
+
+    def __init__(self, themes=DEFAULT_THEMES):
+        self.themes = list(themes)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+
+        for theme_id, phrases in enumerate(themes.values()):
+            for phrase in phrases:
+                state = 0
+                for word in words(phrase):
+                    following = self.goto[state].get(word)
+                    if following is None:
+                        following = self.goto[state][word] = len(self.goto)
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.output.append(())
+                    state = following
+                if state and theme_id not in self.output[state]:
+                    self.output[state] += (theme_id,)
+
+        # Breadth-first, so each state's failure target is finished before its children need it
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(word, 0)
+                self.fail[following] = target
+                self.output[following] += tuple(t for t in self.output[target] if t not in self.output[following])
+
+    @classmethod
+    def load(cls, path):
+        """Tagger for a JSON file of {theme: [phrase, ...]}"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def tag(self, text):
+        """IDs of the themes whose phrases occur in text"""
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        state = 0
+        for word in words(text):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def postings(self, texts):
+        """{theme: [(index, text), ...]} for every theme, in dictionary and text order"""
+        postings = {theme: [] for theme in self.themes}
+        for i, text in enumerate(texts):
+            for theme_id in sorted(self.tag(text)):
+                postings[self.themes[theme_id]].append((i, text))
+        return postings
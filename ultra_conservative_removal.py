@@ -4,34 +4,42 @@ Ultra Conservative Duplicate Removal
 Only removes truly identical entries, preserves all nuanced variations
 """
 
-import re
-import difflib
+from fingerprints import FingerprintStore, normalize_field
+from html_patcher import TextPatch, remove_records, set_total_count, write_atomically
+from instrumentation import STATS
+from initiatives_parser import load_initiatives, parse_initiatives
+from scoring import bounded_ratio
 
-def extract_initiatives_safe():
-    """Safely extract initiatives from HTML"""
-    with open('/workspace/index.html', 'r') as f:
-        content = f.read()
-    
-    # Find initiatives using a more robust pattern
-    pattern = r'{\s*title:\s*"([^"]+)",\s*description:\s*"([^"]+)",\s*category:\s*"([^"]+)",\s*impact:\s*"([^"]+)",\s*beneficiaries:\s*"([^"]+)",\s*icon:\s*"([^"]+)"\s*}'
-    
-    matches = re.findall(pattern, content, re.DOTALL)
+# Fingerprints of the last cleanup, so unchanged records are not hashed again
+FINGERPRINTS_PATH = '/workspace/index.fingerprints.json'
+
+def extract_initiatives_safe(store):
+    """Safely extract initiatives from HTML, fingerprinting them through store"""
+    try:
+        parsed = load_initiatives('/workspace/index.html')
+    except ValueError as error:
+        print(f"❌ Could not parse initiatives array: {error}")
+        return []
+    if parsed is None:
+        print("❌ Could not find initiatives array")
+        return []
     
     initiatives = []
-    for i, match in enumerate(matches):
-        initiatives.append({
-            'index': i,
-            'title': match[0].strip(),
-            'description': match[1].strip(),
-            'category': match[2].strip(),
-            'impact': match[3].strip(),
-            'beneficiaries': match[4].strip(),
-            'icon': match[5].strip()
-        })
+    for record in parsed:
+        initiative = {'index': record.index}
+        initiative.update((field, value.strip()) for field, value in record.to_dict().items())
+        initiative['fingerprint'] = store.get(parsed.raw(record), initiative)
+        initiatives.append(initiative)
     
     print(f"✅ Safely extracted {len(initiatives)} initiatives")
+    print(f"🔑 Fingerprints: {store.hits} reused, {store.misses} computed")
     return initiatives
 
+def same_signature(a, b):
+    """Confirm a fingerprint match on the text itself before anything is removed"""
+    return (normalize_field(a['title']) == normalize_field(b['title'])
+            and normalize_field(a['description']) == normalize_field(b['description']))
+
 def find_ultra_conservative_duplicates(initiatives):
     """Find only truly identical duplicates"""
     print("\n🎯 ULTRA CONSERVATIVE DUPLICATE DETECTION")
@@ -42,16 +50,15 @@ def find_ultra_conservative_duplicates(initiatives):
     seen_combinations = {}
     
     for i, init in enumerate(initiatives):
-        # Create a signature: title + description (normalized)
-        title_norm = re.sub(r'\s+', ' ', init['title'].lower().strip())
-        desc_norm = re.sub(r'\s+', ' ', init['description'].lower().strip())
-        signature = f"{title_norm}|||{desc_norm}"
+        # Signature: hashes of the normalized title and description
+        signature = init['fingerprint'].signature
         
-        if signature in seen_combinations:
+        if signature in seen_combinations and same_signature(initiatives[seen_combinations[signature]], init):
             original_idx = seen_combinations[signature]
             original = initiatives[original_idx]
+            identical = original['fingerprint'].record == init['fingerprint'].record
             
-            print(f"🎯 IDENTICAL DUPLICATE FOUND:")
+            print(f"🎯 {'IDENTICAL RECORD' if identical else 'IDENTICAL DUPLICATE'} FOUND:")
             print(f"   Original #{original_idx}: '{original['title']}'")
             print(f"   Duplicate #{i}: '{init['title']}'")
             print(f"   → Removing duplicate #{i}")
@@ -73,13 +80,13 @@ def find_ultra_conservative_duplicates(initiatives):
             original = initiatives[original_idx]
             
             # Only remove if descriptions are also very similar (95%+ match)
-            desc_similarity = difflib.SequenceMatcher(
-                None, 
+            desc_similarity = bounded_ratio(
                 original['description'].lower(), 
-                init['description'].lower()
-            ).ratio()
+                init['description'].lower(),
+                0.95
+            )
             
-            if desc_similarity >= 0.95:
+            if desc_similarity is not None and desc_similarity >= 0.95:
                 print(f"🎯 EXACT TITLE + SIMILAR DESCRIPTION:")
                 print(f"   Original #{original_idx}: '{original['title']}'")
                 print(f"   Duplicate #{i}: '{init['title']}'")
@@ -111,44 +118,22 @@ def remove_duplicates_safely(duplicates_to_remove):
     with open('/workspace/index.html', 'r') as f:
         content = f.read()
     
-    # Find all initiative blocks
-    pattern = r'(\s*//[^\n]*\n\s*{\s*title:\s*"[^"]+",\s*description:\s*"[^"]+",\s*category:\s*"[^"]+",\s*impact:\s*"[^"]+",\s*beneficiaries:\s*"[^"]+",\s*icon:\s*"[^"]+"\s*}),?'
-    
-    matches = list(re.finditer(pattern, content, re.DOTALL))
-    
-    if len(matches) != len(duplicates_to_remove) + (len(matches) - len(duplicates_to_remove)):
+    try:
+        parsed = parse_initiatives(content)
+    except ValueError as error:
+        print(f"❌ Could not parse initiatives array: {error}")
+        return False
+    if parsed is None or any(idx >= len(parsed) for idx in duplicates_to_remove):
         print("⚠️ Initiative count mismatch - using safer approach")
         return False
     
-    # Create new content by skipping the duplicate indices
-    new_parts = []
-    current_pos = 0
-    
-    for i, match in enumerate(matches):
-        if i not in duplicates_to_remove:
-            # Keep this initiative
-            new_parts.append(content[current_pos:match.start()])
-            new_parts.append(match.group(1))
-            
-            # Add comma if not the last one we're keeping
-            remaining_indices = [idx for idx in range(len(matches)) if idx not in duplicates_to_remove and idx > i]
-            if remaining_indices:
-                new_parts.append(',')
-        
-        current_pos = match.end()
-    
-    # Add the rest of the file
-    new_parts.append(content[current_pos:])
-    
-    new_content = ''.join(new_parts)
+    # Delete every duplicate block in one pass over the file
+    patch = TextPatch(content)
+    final_count = len(parsed) - remove_records(patch, parsed, duplicates_to_remove)
     
     # Update the count
-    final_count = len(matches) - len(duplicates_to_remove)
-    new_content = re.sub(
-        r'<span class="stat-number" id="totalCount">\d+</span>',
-        f'<span class="stat-number" id="totalCount">{final_count}</span>',
-        new_content
-    )
+    set_total_count(patch, final_count)
+    new_content = patch.apply()
     
     # Create backup
     import shutil
@@ -156,8 +141,7 @@ def remove_duplicates_safely(duplicates_to_remove):
     print("✅ Created safety backup: index_safe_backup.html")
     
     # Save the new content
-    with open('/workspace/index.html', 'w') as f:
-        f.write(new_content)
+    write_atomically('/workspace/index.html', new_content)
     
     print(f"✅ Successfully removed {len(duplicates_to_remove)} identical duplicates")
     print(f"📊 Final count: {final_count} unique initiatives")
@@ -172,11 +156,15 @@ def ultra_conservative_removal():
     print()
     
     # Step 1: Extract safely
-    initiatives = extract_initiatives_safe()
+    STATS.lap('extract')
+    store = FingerprintStore(FINGERPRINTS_PATH)
+    initiatives = extract_initiatives_safe(store)
     if not initiatives:
         return False
+    store.save()
     
     # Step 2: Find only truly identical duplicates
+    STATS.lap('detect')
     duplicates_to_remove = find_ultra_conservative_duplicates(initiatives)
     
     if not duplicates_to_remove:
@@ -185,6 +173,7 @@ def ultra_conservative_removal():
         return True
     
     # Step 3: Remove safely
+    STATS.lap('remove')
     success = remove_duplicates_safely(duplicates_to_remove)
     
     if success:
@@ -197,4 +186,5 @@ def ultra_conservative_removal():
     return success
 
 if __name__ == "__main__":
-    ultra_conservative_removal()
\ No newline at end of file
+    # No arguments here; DEDUP_STATS / DEDUP_PROFILE switch instrumentation on
+    STATS.run('ultra_conservative_removal', ultra_conservative_removal)
\ No newline at end of file